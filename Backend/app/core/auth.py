@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import decode_token_claims
+from app.database.session import get_async_db
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_MAX_ENTRIES = 10000
+# Upper bound on how long a cached principal is trusted, so access level
+# changes made by another worker process are picked up even for long tokens.
+PRINCIPAL_CACHE_MAX_TTL_SECONDS = 300
+
+
+class Principal(NamedTuple):
+    id: str
+    user_name: str
+    access_level: str
+
+
+class PrincipalCache:
+    """Bounded LRU of verified token -> principal, entries expire with the token."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            item = self._entries.get(token)
+            if item is None:
+                return None
+            if item[0] <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return item[1]
+
+    def set(self, token: str, principal: Principal, expires_at: float) -> None:
+        expires_at = min(expires_at, time.time() + PRINCIPAL_CACHE_MAX_TTL_SECONDS)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, principal)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str) -> None:
+        _, principal = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Forget cached principals of a user, call after deleting it or changing its access."""
+    principal_cache.invalidate_user(user_id)
+
+
+# ORM writes to a user drop its cached principals automatically
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate_user(target.id)
+
+
+async def get_current_user(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)) -> Principal:
+    """Shared auth dependency: Authorization: Bearer <JWT> -> Principal.
+
+    Repeat requests with the same token are answered from the principal cache,
+    skipping both the signature check and the user lookup.
+    """
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    token = authorization.split(" ", 1)[1]
+    principal = principal_cache.get(token)
+    if principal:
+        return principal
+
+    claims = decode_token_claims(token)
+    if not claims or not claims.get("sub"):
+        logger.debug("rejected token", extra={"reason": "invalid"})
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user = await db.scalar(select(User).where(User.id == claims["sub"]))
+    if not user:
+        logger.debug("rejected token", extra={"reason": "unknown user", "user_id": claims["sub"]})
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    principal = Principal(user.id, user.user_name, user.access_level)
+    principal_cache.set(token, principal, float(claims.get("exp", 0)))
+    # Give the connection back to the pool before the handler runs, otherwise a
+    # burst of requests to sync handlers can pin every connection on auth.
+    await db.close()
+    return principal
+
+
+async def require_admin(principal: Principal = Depends(get_current_user)) -> Principal:
+    if principal.access_level != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return principal
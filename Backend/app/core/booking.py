@@ -0,0 +1,151 @@
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+from sqlalchemy import insert, delete, select, exists, literal
+from sqlalchemy.orm import Session
+from app.core.schedule import SLOT_COLUMNS, Conflict, Slot, booking_conflicts, user_slots_query
+from app.database.session import SessionLocal
+from app.models.event import Event
+from app.models.user import user_events
+
+
+def begin_write(db: Session) -> None:
+    """Take the write lock before the first read of a booking transaction.
+
+    pysqlite only opens a transaction on the first DML statement, so the
+    missing and conflict checks would otherwise read outside it, and two
+    concurrent updates could both pass a check that only one should.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _claim_seat(db: Session, user_id: str, event_id: str) -> bool:
+    # Single conditional INSERT: the booking row is only written if a seat is
+    # free and the user does not hold it yet, so concurrent bookings can never
+    # oversell. The user_events trigger bumps current_attendees.
+    seat_free = exists().where(Event.id == event_id, Event.current_attendees < Event.max_attendees)
+    already_booked = exists().where(
+        user_events.c.user_id == user_id, user_events.c.event_id == event_id
+    )
+    stmt = insert(user_events).from_select(
+        ["user_id", "event_id"],
+        select(literal(user_id), literal(event_id)).where(seat_free, ~already_booked),
+    )
+    return db.execute(stmt).rowcount == 1
+
+
+def is_booked(db: Session, user_id: str, event_id: str) -> bool:
+    stmt = select(user_events.c.event_id).where(
+        user_events.c.user_id == user_id, user_events.c.event_id == event_id
+    )
+    return db.execute(stmt).first() is not None
+
+
+def book_events(db: Session, user_id: str, event_ids: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Claim one seat per event for the user, returns the ids claimed and the ids sold out.
+
+    Events the user already holds are skipped. Nothing is committed here so the
+    caller decides whether to commit or roll back the whole request.
+    """
+    claimed, sold_out = [], []
+    for event_id in dict.fromkeys(event_ids):
+        if _claim_seat(db, user_id, event_id):
+            claimed.append(event_id)
+        elif not is_booked(db, user_id, event_id):
+            sold_out.append(event_id)
+    return claimed, sold_out
+
+
+def cancel_events(db: Session, user_id: str, event_ids: Iterable[str]) -> List[str]:
+    """Release the user's seats for the given events, returns the ids actually released.
+
+    The user_events trigger gives the seat back to current_attendees.
+    """
+    released = []
+    for event_id in dict.fromkeys(event_ids):
+        removed = db.execute(
+            delete(user_events).where(
+                user_events.c.user_id == user_id, user_events.c.event_id == event_id
+            )
+        ).rowcount
+        if removed:
+            released.append(event_id)
+    return released
+
+
+def user_event_ids(db: Session, user_id: str) -> List[str]:
+    return list(db.scalars(select(user_events.c.event_id).where(user_events.c.user_id == user_id)))
+
+
+@dataclass
+class BookingUpdate:
+    user_id: str
+    add: List[str] = field(default_factory=list)
+    remove: List[str] = field(default_factory=list)
+    # Reject the whole update when a new booking overlaps another one
+    strict: bool = False
+
+
+@dataclass
+class BookingResult:
+    missing: List[str] = field(default_factory=list)
+    sold_out: List[str] = field(default_factory=list)
+    # Overlaps the new bookings create; they only fail the update in strict mode
+    conflicts: List[Conflict] = field(default_factory=list)
+    strict: bool = False
+    # The user's bookings after the update and the events whose seat counts it
+    # changed, only filled in when it succeeded
+    event_ids: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.sold_out and not (self.strict and self.conflicts)
+
+
+def apply_booking(db: Session, change: BookingUpdate) -> BookingResult:
+    """Book and cancel seats for one updateUserEvents call without committing.
+
+    When an event is unknown or sold out (or, in strict mode, overlaps another
+    booking) nothing further is done and the caller must roll back, since
+    earlier seats of the same call may already be claimed.
+    """
+    result = BookingResult(strict=change.strict)
+    if change.add:
+        adding = [Slot(*row) for row in db.execute(select(*SLOT_COLUMNS).where(Event.id.in_(change.add)))]
+        found = {slot.event_id for slot in adding}
+        result.missing = [event_id for event_id in dict.fromkeys(change.add) if event_id not in found]
+        if result.missing:
+            return result
+        # Only the user's bookings on the dates being added can overlap
+        removing = set(change.remove)
+        booked = [
+            Slot(*row) for row in db.execute(user_slots_query(change.user_id, {slot.date for slot in adding}))
+            if row.id not in removing
+        ]
+        result.conflicts = booking_conflicts(booked, adding)
+        if change.strict and result.conflicts:
+            return result
+        claimed, result.sold_out = book_events(db, change.user_id, change.add)
+        if result.sold_out:
+            return result
+        result.changed.extend(claimed)
+    if change.remove:
+        result.changed.extend(cancel_events(db, change.user_id, change.remove))
+    result.event_ids = user_event_ids(db, change.user_id)
+    return result
+
+
+def commit_booking(change: BookingUpdate) -> BookingResult:
+    # Per-request path: every call is its own write transaction
+    with SessionLocal() as db:
+        if change.strict:
+            # The overlap check must see every booking committed before ours;
+            # otherwise the conflicts are only reported and the lock waits
+            # would just slow down on-sale spikes
+            begin_write(db)
+        result = apply_booking(db, change)
+        if result.ok:
+            db.commit()
+    return result
@@ -0,0 +1,87 @@
+"""Group commit for bookings during on-sale spikes.
+
+SQLite has a single writer, so under load every updateUserEvents call queues
+for the write lock and pays its own commit. With BOOKING_QUEUE enabled the
+calls are put on an in-process queue instead. One writer task drains it and
+applies up to BOOKING_BATCH_SIZE calls per transaction. Each call runs inside
+its own savepoint, so a sold-out call is rolled back alone and the rest of the
+batch still commits. Every caller gets its own BookingResult back.
+"""
+import asyncio
+import contextvars
+from typing import List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.booking import BookingResult, BookingUpdate, apply_booking, begin_write
+from app.database.session import SessionLocal
+
+
+def apply_batch(changes: List[BookingUpdate]) -> List[BookingResult]:
+    """Apply the updates in order in one transaction, one savepoint each."""
+    results = []
+    with SessionLocal() as db:
+        # Also keeps the first RELEASE SAVEPOINT from committing on its own
+        begin_write(db)
+        for change in changes:
+            savepoint = db.begin_nested()
+            result = apply_booking(db, change)
+            if result.ok:
+                savepoint.commit()
+            else:
+                savepoint.rollback()
+            results.append(result)
+        db.commit()
+    return results
+
+
+class BookingQueue:
+    def __init__(self, max_batch: int = 256):
+        self.max_batch = max_batch
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    def _ensure_writer(self) -> None:
+        # The writer lives on the loop serving requests, started on first use
+        # (and again if the app is now served from a different loop)
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._writer is not None and not self._writer.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        # A fresh context, or the writer's SQL would be charged to the request
+        # that happened to start it (metrics.current_request)
+        self._writer = loop.create_task(self._run(), context=contextvars.Context())
+
+    async def submit(self, change: BookingUpdate) -> BookingResult:
+        self._ensure_writer()
+        future = self._loop.create_future()
+        self._queue.put_nowait((change, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[BookingUpdate, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            # Calls queue up while this batch is written and form the next one
+            try:
+                results = await run_in_threadpool(apply_batch, [change for change, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                # The caller may have gone away (client disconnect), its booking still stands
+                if not future.done():
+                    future.set_result(result)
+
+
+booking_queue = BookingQueue(settings.booking_batch_size)
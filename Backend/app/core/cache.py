@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+
+from app.core.config import settings
+
+# 0 turns the event cache off
+EVENT_CACHE_TTL_SECONDS = settings.event_cache_ttl
+EVENT_CACHE_MAX_ENTRIES = 1024
+EVENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a TTL, bounded by entry count and total bytes.
+
+    `generation` is bumped on every invalidation; a value built from a read that
+    started before an invalidation is dropped instead of stored, so a slow reader
+    can't put stale data back after a write.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: str, value: CachedResponse, generation: int) -> None:
+        size = len(value.body)
+        if size > self.max_bytes or self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, predicate: Callable[[str], bool]) -> None:
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if predicate(k)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        self.invalidate(lambda key: True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value.body)
+
+
+# Event lookups and catalog listings, see app/routers/events.py for the keys
+event_cache = LRUCache(EVENT_CACHE_TTL_SECONDS, EVENT_CACHE_MAX_ENTRIES, EVENT_CACHE_MAX_BYTES)
+
+LISTING_PREFIXES = ("all:", "category:", "search:")
+
+
+def event_key(event_id: str) -> str:
+    return f"event:{event_id}"
+
+
+def invalidate_events(event_ids: Iterable[str] = (), categories: Optional[Iterable[Optional[str]]] = None) -> None:
+    """Drop cached entries for the given events and the catalog listings.
+
+    With `categories` (e.g. a newly created event's) only the category listings
+    that include one of them are dropped, the other categories' serialized
+    bodies stay cached. Full catalog and search listings always go.
+    """
+    keys = {event_key(event_id) for event_id in event_ids}
+    if categories is None:
+        event_cache.invalidate(lambda key: key in keys or key.startswith(LISTING_PREFIXES))
+        return
+    changed = {category for category in categories if category is not None}
+
+    def stale(key: str) -> bool:
+        if key.startswith("category:"):
+            return not changed.isdisjoint(key[len("category:"):].split(","))
+        return key in keys or key.startswith(LISTING_PREFIXES)
+
+    event_cache.invalidate(stale)
@@ -0,0 +1,68 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class Settings:
+    """Runtime settings read from the environment, defaults suit local development."""
+
+    database_url: str = field(default_factory=lambda: os.getenv("DATABASE_URL", "sqlite:///./app.db"))
+    # Optional separate database for GET routes (e.g. a replica), defaults to database_url
+    read_database_url: Optional[str] = field(default_factory=lambda: os.getenv("READ_DATABASE_URL"))
+    pool_size: int = field(default_factory=lambda: _env_int("DB_POOL_SIZE", 5))
+    max_overflow: int = field(default_factory=lambda: _env_int("DB_MAX_OVERFLOW", 10))
+    pool_timeout: int = field(default_factory=lambda: _env_int("DB_POOL_TIMEOUT", 30))
+    # SQLite only: WAL lets readers run alongside the single writer, NORMAL
+    # sync is durable in WAL mode and skips an fsync per commit.
+    sqlite_journal_mode: str = field(default_factory=lambda: os.getenv("SQLITE_JOURNAL_MODE", "WAL"))
+    sqlite_synchronous: str = field(default_factory=lambda: os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"))
+    sqlite_busy_timeout_ms: int = field(default_factory=lambda: _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    sqlite_mmap_size: int = field(default_factory=lambda: _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    # Negative values are KiB, so this is a 64 MiB page cache per connection
+    sqlite_cache_size: int = field(default_factory=lambda: _env_int("SQLITE_CACHE_SIZE", -64 * 1024))
+    # Group commit for bookings: updateUserEvents calls are queued and a single
+    # writer applies up to booking_batch_size of them per transaction.
+    booking_queue: bool = field(default_factory=lambda: _env_bool("BOOKING_QUEUE", False))
+    booking_batch_size: int = field(default_factory=lambda: _env_int("BOOKING_BATCH_SIZE", 256))
+    # Reject updateUserEvents bookings that overlap another booking of the
+    # user; requests can still choose with their `strict` field
+    schedule_strict: bool = field(default_factory=lambda: _env_bool("SCHEDULE_STRICT", False))
+    # Lifetime of cached event responses (serialized bytes), 0 disables the cache
+    event_cache_ttl: int = field(default_factory=lambda: _env_int("EVENT_CACHE_TTL_SECONDS", 30))
+    # Live seat feed: changed events are read and pushed at most this often,
+    # and a listener more than seat_feed_buffer events behind is told to resync
+    seat_feed_interval_ms: int = field(default_factory=lambda: _env_int("SEAT_FEED_INTERVAL_MS", 250))
+    seat_feed_buffer: int = field(default_factory=lambda: _env_int("SEAT_FEED_BUFFER", 1000))
+    seat_feed_heartbeat: int = field(default_factory=lambda: _env_int("SEAT_FEED_HEARTBEAT_SECONDS", 15))
+    # Responses kept for Idempotency-Key retries of bookings, createEvent and
+    # signup, per worker; 0 only coalesces retries that overlap the first call
+    idempotency_ttl: int = field(default_factory=lambda: _env_int("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+    idempotency_max_entries: int = field(default_factory=lambda: _env_int("IDEMPOTENCY_MAX_ENTRIES", 10000))
+    # Observability: /metrics plus request and SQL instrumentation, structured logs
+    metrics_enabled: bool = field(default_factory=lambda: _env_bool("METRICS_ENABLED", True))
+    # Statements slower than this are logged (logger app.db.slow) and counted, 0 disables
+    slow_query_ms: int = field(default_factory=lambda: _env_int("SLOW_QUERY_MS", 200))
+    log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO").upper())
+    # "json" for one JSON object per line, "text" for the plain format
+    log_format: str = field(default_factory=lambda: os.getenv("LOG_FORMAT", "json"))
+
+    def sqlite_pragmas(self) -> Dict[str, object]:
+        return {
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "busy_timeout": self.sqlite_busy_timeout_ms,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+        }
+
+
+settings = Settings()
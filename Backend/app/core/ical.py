@@ -0,0 +1,63 @@
+"""iCalendar (RFC 5545) export of a user's bookings.
+
+Each event becomes one VEVENT and is encoded on its own, so an export can be
+streamed as rows come out of the database. Events carry no time zone, so
+their times are written as floating local times.
+"""
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from app.models.event import Event
+
+# Selected in this order by the export query
+ICS_COLUMNS = (Event.id, Event.title, Event.description, Event.category, Event.date, Event.start_time, Event.end_time)
+
+ICS_HEADER = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Event Booking//Itinerary//EN\r\nCALSCALE:GREGORIAN\r\n"
+ICS_FOOTER = b"END:VCALENDAR\r\n"
+
+# Content lines longer than this many octets must be folded
+LINE_LIMIT = 75
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+    )
+
+
+def _line(name: str, value: str) -> bytes:
+    raw = f"{name}:{value}".encode()
+    if len(raw) <= LINE_LIMIT:
+        return raw + b"\r\n"
+    # Fold on octets without splitting a UTF-8 sequence, continuations start with a space
+    parts, start, limit = [], 0, LINE_LIMIT
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and raw[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(raw[start:end])
+        start, limit = end, LINE_LIMIT - 1
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def ics_stamp(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+
+
+def ics_event(row: Sequence, stamp: str) -> bytes:
+    event_id, title, description, category, day, start, end = row
+    lines = [
+        b"BEGIN:VEVENT\r\n",
+        _line("UID", f"{event_id}@event-booking"),
+        _line("DTSTAMP", stamp),
+        _line("DTSTART", f"{day:%Y%m%d}T{start:%H%M%S}"),
+        _line("DTEND", f"{day:%Y%m%d}T{end:%H%M%S}"),
+        _line("SUMMARY", _escape(title)),
+    ]
+    if description:
+        lines.append(_line("DESCRIPTION", _escape(description)))
+    if category:
+        lines.append(_line("CATEGORIES", _escape(category)))
+    lines.append(b"END:VEVENT\r\n")
+    return b"".join(lines)
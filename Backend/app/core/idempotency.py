@@ -0,0 +1,183 @@
+"""Idempotency-Key support for write routes that clients retry.
+
+A request carrying an `Idempotency-Key` header on one of the configured
+routes runs once. Its response is kept for IDEMPOTENCY_TTL_SECONDS, and a
+retry with the same key, route, caller and body gets the stored response
+back (marked `Idempotent-Replayed: true`) without reaching the handler, so
+no transaction, bcrypt hash or duplicate row. A retry that arrives while the
+first request is still running waits for it instead of racing it.
+
+Keys are scoped to the method, path and Authorization header. Reusing a key
+with a different body is a client bug and answered with 422. Server errors
+are not stored, so the next retry runs again. The store is per worker
+process, like the other in-process caches.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+IDEMPOTENCY_TTL_SECONDS = settings.idempotency_ttl
+IDEMPOTENCY_MAX_ENTRIES = settings.idempotency_max_entries
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: bytes
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyStore:
+    """Bounded LRU of completed responses with a TTL, plus the requests in flight.
+
+    Only touched from the event loop, so it needs no lock. Running requests
+    are kept apart from the LRU so eviction can never split a burst of
+    retries into two executions.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._done: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._running: Dict[bytes, Tuple[bytes, asyncio.Future]] = {}
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def get(self, key: bytes) -> Optional[StoredResponse]:
+        item = self._done.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            del self._done[key]
+            return None
+        self._done.move_to_end(key)
+        return item[1]
+
+    def running(self, key: bytes) -> Optional[Tuple[bytes, asyncio.Future]]:
+        return self._running.get(key)
+
+    def start(self, key: bytes, fingerprint: bytes) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._running[key] = (fingerprint, future)
+        return future
+
+    def finish(self, key: bytes, response: Optional[StoredResponse]) -> None:
+        """Wake the waiters; None means nothing was stored and they should run it themselves."""
+        _, future = self._running.pop(key)
+        if response is not None and self.ttl > 0:
+            self._done[key] = (time.monotonic() + self.ttl, response)
+            self._done.move_to_end(key)
+            while len(self._done) > self.max_entries:
+                self._done.popitem(last=False)
+        if not future.done():
+            future.set_result(response)
+
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES)
+
+
+def _route_pattern(template: str) -> "re.Pattern":
+    parts = re.split(r"(\{[^}]+\})", template)
+    return re.compile("".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts) + "$")
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+async def _send_json(send, status: int, detail: str) -> None:
+    body = b'{"detail":"' + detail.encode() + b'"}'
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware applying Idempotency-Key to `routes`, (method, path template) pairs."""
+
+    def __init__(self, app, routes: Iterable[Tuple[str, str]], store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.routes = [(method, _route_pattern(template)) for method, template in routes]
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        key = _header(scope, b"idempotency-key")
+        if key is None or not any(scope["method"] == m and p.match(scope["path"]) for m, p in self.routes):
+            return await self.app(scope, receive, send)
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return await _send_json(send, 400, "Invalid Idempotency-Key")
+
+        # The body is part of the fingerprint, so read it all and replay it to the app
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        store_key = hashlib.sha256(b"\0".join((
+            scope["method"].encode(), scope["path"].encode(), _header(scope, b"authorization") or b"", key,
+        ))).digest()
+        fingerprint = hashlib.sha256(body).digest()
+
+        while True:
+            stored = self.store.get(store_key)
+            if stored is None:
+                running = self.store.running(store_key)
+                if running is None:
+                    break
+                if running[0] != fingerprint:
+                    return await _send_json(send, 422, "Idempotency-Key reused with a different request")
+                # shield: a retry giving up must not cancel the first request's future
+                stored = await asyncio.shield(running[1])
+                if stored is None:
+                    # The first attempt failed, the next waiter in line runs it
+                    continue
+            if stored.fingerprint != fingerprint:
+                return await _send_json(send, 422, "Idempotency-Key reused with a different request")
+            await send({"type": "http.response.start", "status": stored.status,
+                        "headers": stored.headers + [(b"idempotent-replayed", b"true")]})
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        self.store.start(store_key, fingerprint)
+        sent = False
+
+        async def replay_body():
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status, headers, parts = 500, [], []
+
+        async def capture(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status, headers = message["status"], list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                parts.append(message.get("body", b""))
+            await send(message)
+
+        response = None
+        try:
+            await self.app(scope, replay_body, capture)
+            if status < 500:
+                response = StoredResponse(fingerprint, status, headers, b"".join(parts))
+        finally:
+            self.store.finish(store_key, response)
@@ -0,0 +1,123 @@
+"""Overlap checks between a user's bookings.
+
+Two events conflict when they are on the same date and their
+[start_time, end_time) ranges overlap. A ScheduleIndex keeps a user's
+bookings per date sorted by start time. Only bookings starting before the
+candidate ends can overlap, and bisection finds that prefix. A max-end segment
+tree over the sorted bookings skips every subtree whose latest end is before
+the candidate starts. A lookup therefore costs O(log n) per overlap it
+returns, or O(log n) when there is none, however long the other bookings are.
+"""
+from bisect import bisect_left
+from datetime import date, time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+
+from app.models.event import Event
+from app.models.user import user_events
+
+
+class Slot(NamedTuple):
+    event_id: str
+    date: date
+    start_time: time
+    end_time: time
+
+
+class Conflict(NamedTuple):
+    event_id: str
+    conflicting_event_id: str
+    date: date
+
+
+SLOT_COLUMNS = (Event.id, Event.date, Event.start_time, Event.end_time)
+
+
+def user_slots_query(user_id: str, dates: Optional[Iterable[date]] = None):
+    """The user's bookings as Slot rows, optionally only on the given dates."""
+    query = select(*SLOT_COLUMNS).join(user_events, user_events.c.event_id == Event.id).where(user_events.c.user_id == user_id)
+    if dates is not None:
+        query = query.where(Event.date.in_(sorted(set(dates))))
+    return query
+
+
+class _Day:
+    """One date's bookings sorted by start, with a max-end segment tree on top."""
+
+    def __init__(self, slots: List[Slot]):
+        slots.sort(key=lambda s: (s.start_time, s.event_id))
+        self.slots = slots
+        self.starts = [s.start_time for s in slots]
+        self.size = 1
+        while self.size < len(slots):
+            self.size *= 2
+        # Leaves hold each booking's end, inner nodes the latest end below them
+        tree = [time.min] * (2 * self.size)
+        tree[self.size:self.size + len(slots)] = [s.end_time for s in slots]
+        for node in range(self.size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self.tree = tree
+
+    def ending_after(self, start: time, limit: int) -> List[Slot]:
+        """Bookings among the first `limit` that end after `start`."""
+        found = []
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= limit or self.tree[node] <= start:
+                continue
+            if hi - lo == 1:
+                found.append(self.slots[lo])
+                continue
+            mid = (lo + hi) // 2
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        return found
+
+
+class ScheduleIndex:
+    def __init__(self, slots: Iterable[Slot]):
+        by_date: Dict[date, List[Slot]] = {}
+        for slot in slots:
+            by_date.setdefault(slot.date, []).append(slot)
+        self._days = {day: _Day(day_slots) for day, day_slots in by_date.items()}
+
+    def overlapping(self, slot: Slot) -> List[Slot]:
+        day = self._days.get(slot.date)
+        if day is None:
+            return []
+        limit = bisect_left(day.starts, slot.end_time)
+        return [other for other in day.ending_after(slot.start_time, limit) if other.event_id != slot.event_id]
+
+
+def booking_conflicts(booked: Iterable[Slot], adding: Iterable[Slot]) -> List[Conflict]:
+    """Conflicts the new bookings would create, with existing ones or each other.
+
+    `booked` only needs the user's bookings on the dates being added. Events
+    the user already holds are not reported again.
+    """
+    booked = list(booked)
+    held = {slot.event_id for slot in booked}
+    new = [slot for slot in dict((slot.event_id, slot) for slot in adding).values() if slot.event_id not in held]
+    index = ScheduleIndex(booked + new)
+    conflicts, seen = [], set()
+    for slot in new:
+        for other in index.overlapping(slot):
+            pair = frozenset((slot.event_id, other.event_id))
+            if pair not in seen:
+                seen.add(pair)
+                conflicts.append(Conflict(slot.event_id, other.event_id, slot.date))
+    return conflicts
+
+
+def schedule_conflicts(slots: Iterable[Slot]) -> List[Conflict]:
+    """Every overlapping pair in a schedule, by date and start time."""
+    ordered = sorted(slots, key=lambda s: (s.date, s.start_time, s.event_id))
+    conflicts = []
+    for i, slot in enumerate(ordered):
+        for other in ordered[i + 1:]:
+            if other.date != slot.date or other.start_time >= slot.end_time:
+                break
+            conflicts.append(Conflict(slot.event_id, other.event_id, slot.date))
+    return conflicts
@@ -0,0 +1,191 @@
+"""In-process pub/sub of seat counts for the live availability stream.
+
+Writers only mark events as changed (`seat_hub.touch`), which is a set insert
+and costs nothing while nobody listens. A single flusher task per worker wakes
+at most every SEAT_FEED_INTERVAL_MS, reads the current counts of all changed
+events in one query and hands each subscriber the ones it asked for. Many
+bookings of the same event between two flushes therefore become one update,
+and the feed's database load does not grow with the number of listeners.
+
+Each subscriber has a bounded buffer keyed by event id, so a slow client only
+ever holds the latest count per event. If it falls more than
+SEAT_FEED_BUFFER events behind, the buffer is dropped and the client is told
+to resync from the catalog instead. An idle subscriber is one coroutine
+waiting on an asyncio.Event, with no database connection or thread held.
+"""
+import asyncio
+import contextvars
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.database.session import SessionLocal
+from app.models.event import Event
+
+SEAT_FEED_INTERVAL_MS = settings.seat_feed_interval_ms
+SEAT_FEED_BUFFER = settings.seat_feed_buffer
+# Keeps the IN list of the count query under SQLite's variable limit
+SEAT_QUERY_CHUNK = 500
+
+logger = logging.getLogger(__name__)
+
+
+def _load_seats(event_ids: List[str]) -> List[dict]:
+    seats = []
+    with SessionLocal() as db:
+        for start in range(0, len(event_ids), SEAT_QUERY_CHUNK):
+            rows = db.execute(
+                select(Event.id, Event.category, Event.current_attendees, Event.max_attendees)
+                .where(Event.id.in_(event_ids[start:start + SEAT_QUERY_CHUNK]))
+            )
+            seats.extend(
+                {"id": row.id, "category": row.category, "current_attendees": row.current_attendees,
+                 "max_attendees": row.max_attendees}
+                for row in rows
+            )
+    return seats
+
+
+class Subscription:
+    """One listener: its filter and the seat counts it has not received yet."""
+
+    def __init__(self, event_ids: Iterable[str] = (), categories: Iterable[str] = (),
+                 max_pending: int = SEAT_FEED_BUFFER):
+        self.event_ids = frozenset(event_ids)
+        self.categories = frozenset(categories)
+        self.max_pending = max_pending
+        self.overflowed = False
+        self.closed = False
+        self._pending: Dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, seats: List[dict]) -> None:
+        # Called on the hub's loop only
+        if self.overflowed or not seats:
+            return
+        pending = self._pending
+        for seat in seats:
+            if seat["id"] not in pending and len(pending) >= self.max_pending:
+                pending.clear()
+                self.overflowed = True
+                break
+            pending[seat["id"]] = seat
+        self._ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[List[dict]]:
+        """Wait for updates; returns them (coalesced per event), None on timeout.
+
+        When `overflowed` is set the updates were dropped instead; the caller
+        should tell its client to refetch and call `resynced()`.
+        """
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._ready.clear()
+        pending, self._pending = list(self._pending.values()), {}
+        return pending
+
+    def resynced(self) -> None:
+        self.overflowed = False
+
+
+class SeatHub:
+    def __init__(self, interval_ms: int = SEAT_FEED_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._by_event: Dict[str, Set[Subscription]] = {}
+        self._by_category: Dict[str, Set[Subscription]] = {}
+        self._everything: Set[Subscription] = set()
+        self._count = 0
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def touch(self, event_ids: Iterable[str]) -> None:
+        """Mark events whose seat counts changed, callable from any thread."""
+        if not self._count:
+            return
+        with self._lock:
+            was_idle = not self._dirty
+            self._dirty.update(event_ids)
+            wake = was_idle and bool(self._dirty)
+        if wake and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def subscribe(self, event_ids: Iterable[str] = (), categories: Iterable[str] = ()) -> Subscription:
+        loop = asyncio.get_running_loop()
+        if self._flusher is None or self._flusher.done() or self._loop is not loop:
+            # The flusher lives on the loop serving the streams, started on first
+            # use (and again if the app is now served from a different loop)
+            self._loop, self._wakeup = loop, asyncio.Event()
+            # In a fresh context so flush queries aren't charged to this request
+            self._flusher = loop.create_task(self._run(), context=contextvars.Context())
+        sub = Subscription(event_ids, categories)
+        if not sub.event_ids and not sub.categories:
+            self._everything.add(sub)
+        for event_id in sub.event_ids:
+            self._by_event.setdefault(event_id, set()).add(sub)
+        for category in sub.categories:
+            self._by_category.setdefault(category, set()).add(sub)
+        self._count += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        if sub.closed:
+            return
+        sub.closed = True
+        self._everything.discard(sub)
+        for index, keys in ((self._by_event, sub.event_ids), (self._by_category, sub.categories)):
+            for key in keys:
+                subs = index.get(key)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del index[key]
+        self._count -= 1
+
+    def publish(self, seats: List[dict]) -> None:
+        if not seats:
+            return
+        # Catch-all listeners take the whole flush, the others only their matches
+        matched: Dict[Subscription, List[dict]] = {}
+        for seat in seats:
+            for sub in self._by_event.get(seat["id"], ()):
+                matched.setdefault(sub, []).append(seat)
+            for sub in self._by_category.get(seat["category"], ()):
+                matched.setdefault(sub, []).append(seat)
+        for sub in self._everything:
+            sub.offer(seats)
+        for sub, subset in matched.items():
+            sub.offer(subset)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Let more changes pile up so bursts cost one query
+            await asyncio.sleep(self.interval)
+            with self._lock:
+                dirty, self._dirty = list(self._dirty), set()
+            if not dirty or not self._count:
+                continue
+            try:
+                seats = await run_in_threadpool(_load_seats, dirty)
+            except Exception:
+                # A failed read must not stop the flusher, listeners get the next change
+                logger.exception("seat feed flush failed", extra={"events": len(dirty)})
+                continue
+            self.publish(seats)
+
+
+seat_hub = SeatHub()
@@ -1,5 +1,9 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
@@ -7,7 +11,53 @@ SECRET_KEY = "CHANGE_ME_SECRET"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor. Stored hashes with a different cost are rehashed on login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so a thread pool spreads hashing over all cores
+# while keeping it off the request threads.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# Hash jobs allowed to wait for a worker before new ones are refused.
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(HASH_WORKERS * 8)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has HASH_MAX_PENDING jobs queued."""
+
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_max_pending = HASH_MAX_PENDING
+_hash_pending = 0
+_hash_lock = threading.Lock()
+
+
+def configure_hashing(workers: int, max_pending: int) -> None:
+    """Replace the hashing pool, used by benchmarks and tests."""
+    global _hash_executor, _hash_max_pending
+    old, _hash_executor, _hash_max_pending = _hash_executor, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt"), max_pending
+    old.shutdown(wait=True)
+
+
+def _release_slot(_: Future) -> None:
+    global _hash_pending
+    with _hash_lock:
+        _hash_pending -= 1
+
+
+def _submit(fn, *args) -> Future:
+    global _hash_pending
+    with _hash_lock:
+        if _hash_pending >= _hash_max_pending:
+            raise PasswordHasherBusy()
+        _hash_pending += 1
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _release_slot(None)
+        raise
+    future.add_done_callback(_release_slot)
+    return future
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None):
     if expires_delta is None:
@@ -17,14 +67,27 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    return pwd_context.verify(plain_password, password_hash)
+    return _submit(pwd_context.verify, plain_password, password_hash).result()
 
 def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+    return _submit(pwd_context.hash, plain_password).result()
 
-def decode_token(token: str) -> Optional[str]:
+async def hash_password_async(plain_password: str) -> str:
+    return await asyncio.wrap_future(_submit(pwd_context.hash, plain_password))
+
+async def verify_and_update_password(plain_password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the hashing pool, returns (valid, new_hash).
+
+    new_hash is set when the stored hash uses an outdated cost factor.
+    """
+    return await asyncio.wrap_future(_submit(pwd_context.verify_and_update, plain_password, password_hash))
+
+def decode_token_claims(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+def decode_token(token: str) -> Optional[str]:
+    claims = decode_token_claims(token)
+    return claims.get("sub") if claims else None
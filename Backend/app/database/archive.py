@@ -0,0 +1,105 @@
+"""Moves past events and their bookings out of the live tables.
+
+Almost all traffic concerns future dates, but every catalog query and index
+scan of `events`/`user_events` also pays for years of past events. The job
+moves events dated before a cutoff, with their user_events rows, into
+`events_archive`/`user_events_archive`, so the live tables and their indexes
+stay small enough to live in the page cache.
+
+Each batch is one write transaction: copy, then delete from the live tables.
+Progress is the live table itself, so an interrupted run loses at most the
+batch in flight and the next run carries on where it stopped. Run with
+
+    python -m app.database.archive [--before YYYY-MM-DD] [--batch-size 1000]
+"""
+import argparse
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.attendees import paused_attendee_triggers
+from app.models.archive import events_archive, user_events_archive
+
+ARCHIVE_BATCH_SIZE = 1000
+
+_EVENT_COLUMNS = ", ".join(column.name for column in events_archive.columns)
+
+# The batch's ids, in the (date, start_time, id) index order so each batch
+# reads one contiguous range
+_PICK_SQL = (
+    "INSERT INTO temp.archive_batch (id) "
+    "SELECT id FROM events WHERE date < ? ORDER BY date, start_time, id LIMIT ?"
+)
+_MOVE_SQL = [
+    f"INSERT OR REPLACE INTO events_archive ({_EVENT_COLUMNS}) "
+    f"SELECT {_EVENT_COLUMNS} FROM events WHERE id IN (SELECT id FROM temp.archive_batch)",
+    "INSERT OR IGNORE INTO user_events_archive (user_id, event_id) "
+    "SELECT user_id, event_id FROM user_events WHERE event_id IN (SELECT id FROM temp.archive_batch)",
+]
+_DELETE_BOOKINGS_SQL = "DELETE FROM user_events WHERE event_id IN (SELECT id FROM temp.archive_batch)"
+# The events_fts triggers drop the search entries with the rows
+_DELETE_EVENTS_SQL = "DELETE FROM events WHERE id IN (SELECT id FROM temp.archive_batch)"
+
+
+def create_archive_tables(conn: Connection) -> None:
+    """Migration: databases created before the archive get its tables."""
+    events_archive.create(conn, checkfirst=True)
+    user_events_archive.create(conn, checkfirst=True)
+
+
+def _archive_batch(conn: Connection, before: date, batch_size: int) -> int:
+    # Take the write lock first, a deferred transaction could fail to upgrade
+    # its read snapshot once a booking commits in between
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+    conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id VARCHAR PRIMARY KEY)")
+    conn.exec_driver_sql("DELETE FROM temp.archive_batch")
+    picked = conn.exec_driver_sql(_PICK_SQL, (before.isoformat(), batch_size)).rowcount
+    if not picked:
+        return 0
+    for statement in _MOVE_SQL:
+        conn.exec_driver_sql(statement)
+    # The archived current_attendees already counts these bookings, the
+    # triggers would only decrement rows that are about to go
+    with paused_attendee_triggers(conn):
+        conn.exec_driver_sql(_DELETE_BOOKINGS_SQL)
+    conn.exec_driver_sql(_DELETE_EVENTS_SQL)
+    return picked
+
+
+def archive_past_events(engine: Engine, before: Optional[date] = None,
+                        batch_size: int = ARCHIVE_BATCH_SIZE, max_batches: Optional[int] = None) -> int:
+    """Archive events dated before `before` (default today), returns how many moved.
+
+    `max_batches` stops early, e.g. to spread a large backlog over several
+    off-peak runs.
+    """
+    before = before or date.today()
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        with engine.begin() as conn:
+            picked = _archive_batch(conn, before, batch_size)
+        moved += picked
+        batches += 1
+        if picked < batch_size:
+            break
+    return moved
+
+
+def main():
+    from app.database.init_db import init_db
+    from app.database.session import engine
+
+    parser = argparse.ArgumentParser(description="Move past events and their bookings into the archive tables.")
+    parser.add_argument("--before", type=date.fromisoformat, default=None, help="cutoff date, default today")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    init_db()
+    moved = archive_past_events(engine, args.before, args.batch_size, args.max_batches)
+    print(f"{moved} events archived")
+
+
+if __name__ == "__main__":
+    main()
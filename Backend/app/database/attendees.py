@@ -0,0 +1,127 @@
+"""events.current_attendees kept in sync with user_events by the database.
+
+Triggers on user_events add or remove one attendee per booking row, whoever
+writes it (booking routes, ORM relationship changes, scripts, raw SQL). The
+booking code only decides whether a seat may be taken; the count itself is
+never written by application code.
+
+Drift from before the triggers existed, or from bulk loads that pause them, is
+repaired by `reconcile_attendee_counts`, also runnable as
+
+    python -m app.database.attendees [--chunk-size 10000] [--dry-run]
+"""
+import argparse
+from contextlib import contextmanager
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.session import hold_write_lock
+
+ATTENDEE_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS user_events_count_ai AFTER INSERT ON user_events BEGIN "
+    "UPDATE events SET current_attendees = current_attendees + 1 WHERE id = new.event_id; END",
+    "CREATE TRIGGER IF NOT EXISTS user_events_count_ad AFTER DELETE ON user_events BEGIN "
+    "UPDATE events SET current_attendees = MAX(current_attendees - 1, 0) WHERE id = old.event_id; END",
+    "CREATE TRIGGER IF NOT EXISTS user_events_count_au AFTER UPDATE OF event_id ON user_events BEGIN "
+    "UPDATE events SET current_attendees = MAX(current_attendees - 1, 0) WHERE id = old.event_id; "
+    "UPDATE events SET current_attendees = current_attendees + 1 WHERE id = new.event_id; END",
+]
+TRIGGER_NAMES = ["user_events_count_ai", "user_events_count_ad", "user_events_count_au"]
+
+RECONCILE_CHUNK_SIZE = 10000
+
+# Stored vs actual count for the next chunk of events in id order; the count
+# is a covering scan of ix_user_events_event_id per event
+_DRIFT_SQL = text(
+    "SELECT id, current_attendees, "
+    "(SELECT count(*) FROM user_events WHERE user_events.event_id = events.id) AS actual "
+    "FROM events WHERE id > :after ORDER BY id LIMIT :limit"
+)
+_FIX_SQL = (
+    "UPDATE events SET current_attendees = "
+    "(SELECT count(*) FROM user_events WHERE user_events.event_id = events.id) WHERE id IN ({})"
+)
+
+
+def create_attendee_triggers(conn: Connection) -> None:
+    for statement in ATTENDEE_TRIGGERS:
+        conn.exec_driver_sql(statement)
+
+
+def create_attendee_counter(conn: Connection) -> None:
+    """Migration: install the triggers and recount every event once."""
+    create_attendee_triggers(conn)
+    conn.exec_driver_sql(
+        "UPDATE events SET current_attendees = "
+        "(SELECT count(*) FROM user_events WHERE user_events.event_id = events.id)"
+    )
+
+
+@contextmanager
+def paused_attendee_triggers(conn: Connection):
+    """Bulk loads that compute counts themselves skip the per-row trigger updates.
+
+    The caller must leave current_attendees right for the rows it inserts
+    (or run reconcile_attendee_counts afterwards). The triggers are dropped
+    inside a write transaction, taken here if the caller has none open, so
+    other connections keep counting; they are recreated even if the block
+    fails.
+    """
+    hold_write_lock(conn)
+    for name in TRIGGER_NAMES:
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield
+    finally:
+        create_attendee_triggers(conn)
+
+
+def reconcile_attendee_counts(engine: Engine, chunk_size: int = RECONCILE_CHUNK_SIZE,
+                              dry_run: bool = False) -> List[Tuple[str, int, int]]:
+    """Find events whose counter differs from their bookings and fix them.
+
+    Works through the events table in id order, one aggregated query and at
+    most one UPDATE per chunk, each chunk in its own short transaction so
+    bookings are not blocked for long. The UPDATE recounts inside the write,
+    so bookings made between the check and the fix are not lost. Returns
+    (event id, stored, actual) for every drifted event.
+    """
+    drifted = []
+    after = ""
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(_DRIFT_SQL, {"after": after, "limit": chunk_size}).all()
+            if not rows:
+                break
+            after = rows[-1].id
+            chunk = [(row.id, row.current_attendees, row.actual) for row in rows if row.current_attendees != row.actual]
+            if chunk and not dry_run:
+                conn.exec_driver_sql(_FIX_SQL.format(", ".join("?" * len(chunk))), tuple(event_id for event_id, _, _ in chunk))
+            drifted.extend(chunk)
+        if len(rows) < chunk_size:
+            break
+    return drifted
+
+
+def main():
+    from app.database.init_db import init_db
+    from app.database.session import engine
+
+    parser = argparse.ArgumentParser(description="Fix events.current_attendees drift against user_events.")
+    parser.add_argument("--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="only report the drift")
+    args = parser.parse_args()
+
+    init_db()
+    drifted = reconcile_attendee_counts(engine, args.chunk_size, args.dry_run)
+    for event_id, stored, actual in drifted[:50]:
+        print(f" - {event_id}: stored {stored}, actual {actual}")
+    if len(drifted) > 50:
+        print(f"   ... and {len(drifted) - 50} more")
+    print(f"{len(drifted)} events {'drifted' if args.dry_run else 'fixed'}")
+
+
+if __name__ == "__main__":
+    main()
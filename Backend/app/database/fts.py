@@ -0,0 +1,142 @@
+"""SQLite FTS5 index over event titles and descriptions.
+
+`events` has a string primary key, so its implicit rowids are not stable: a
+VACUUM may renumber them. The index is therefore keyed on
+`events_fts_keys.rowid`, an INTEGER PRIMARY KEY that SQLite never renumbers,
+with one key row per event. `events_fts` is contentless: it stores only the
+index, results are joined back to `events` through the keys. Triggers keep
+both in step with every write path (ORM, Core bulk inserts, raw SQL); the
+update trigger only fires for title/description so booking counter updates
+don't touch it.
+"""
+import re
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import column, func, literal_column, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from app.database.session import hold_write_lock
+
+# Title matches weigh more than description matches in the bm25 ranking
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+events_fts = table("events_fts", column("rowid"))
+events_fts_keys = table("events_fts_keys", column("rowid"), column("event_id"))
+fts_rank = func.bm25(literal_column("events_fts"), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+fts_match = literal_column("events_fts").op("MATCH")
+
+_KEY_OF = "(SELECT rowid FROM events_fts_keys WHERE event_id = {}.id)"
+
+INSERT_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts_keys(event_id) VALUES (new.id); "
+    f"INSERT INTO events_fts(rowid, title, description) VALUES ({_KEY_OF.format('new')}, new.title, new.description); END"
+)
+
+# A contentless index can only forget a row given the exact text it indexed,
+# which the triggers have in old.*
+CREATE_FTS = [
+    "CREATE TABLE IF NOT EXISTS events_fts_keys (rowid INTEGER PRIMARY KEY, event_id VARCHAR NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+    "title, description, content='', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    INSERT_TRIGGER,
+    "CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, title, description) "
+    f"VALUES ('delete', {_KEY_OF.format('old')}, old.title, old.description); "
+    "DELETE FROM events_fts_keys WHERE event_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF title, description ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, title, description) "
+    f"VALUES ('delete', {_KEY_OF.format('old')}, old.title, old.description); "
+    f"INSERT INTO events_fts(rowid, title, description) VALUES ({_KEY_OF.format('new')}, new.title, new.description); END",
+    # Index whatever was in events before the table existed
+    "INSERT INTO events_fts_keys(event_id) SELECT id FROM events",
+    "INSERT INTO events_fts(rowid, title, description) "
+    "SELECT k.rowid, e.title, e.description FROM events_fts_keys k JOIN events e ON e.id = k.event_id",
+]
+
+# The first version read the text back from events by its implicit rowid
+_DROP_ROWID_FTS = [
+    "DROP TRIGGER IF EXISTS events_fts_ai",
+    "DROP TRIGGER IF EXISTS events_fts_ad",
+    "DROP TRIGGER IF EXISTS events_fts_au",
+    "DROP TABLE IF EXISTS events_fts",
+]
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def create_fts(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    for statement in CREATE_FTS:
+        conn.exec_driver_sql(statement)
+
+
+def rekey_fts(conn: Connection) -> None:
+    """Rebuild an index created on events' implicit rowids on stable keys."""
+    if conn.dialect.name != "sqlite":
+        return
+    has_keys = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts_keys'"
+    ).first()
+    if has_keys:
+        return
+    for statement in _DROP_ROWID_FTS:
+        conn.exec_driver_sql(statement)
+    create_fts(conn)
+
+
+def join_fts(query: Select) -> Select:
+    """Join a select over events to the index, for fts_match and fts_rank."""
+    return query.join(events_fts_keys, events_fts_keys.c.event_id == literal_column("events.id")).join(
+        events_fts, events_fts.c.rowid == events_fts_keys.c.rowid
+    )
+
+
+@contextmanager
+def deferred_fts_indexing(conn: Connection):
+    """Index rows inserted inside the block with one set-based statement.
+
+    The per-row insert trigger costs about 3x the insert itself, so bulk loads
+    drop it for the duration of the transaction and index the new rowids
+    afterwards. The write lock is taken before the DROP, so the DDL is part of
+    the transaction and no other connection ever sees the table without its
+    trigger. If the block fails the trigger is put back before the error
+    propagates, in case the caller commits anyway. Implicit rowids are only
+    used to find this transaction's rows; they can't change before it commits.
+    """
+    if conn.dialect.name != "sqlite":
+        yield
+        return
+    hold_write_lock(conn)
+    conn.exec_driver_sql("DROP TRIGGER IF EXISTS events_fts_ai")
+    try:
+        last_rowid = conn.exec_driver_sql("SELECT COALESCE(MAX(rowid), 0) FROM events").scalar()
+        last_key = conn.exec_driver_sql("SELECT COALESCE(MAX(rowid), 0) FROM events_fts_keys").scalar()
+        yield
+        conn.exec_driver_sql(
+            "INSERT INTO events_fts_keys(event_id) SELECT id FROM events WHERE rowid > ? ORDER BY rowid", (last_rowid,)
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO events_fts(rowid, title, description) "
+            "SELECT k.rowid, e.title, e.description FROM events_fts_keys k JOIN events e ON e.id = k.event_id "
+            "WHERE k.rowid > ?", (last_key,)
+        )
+    finally:
+        conn.exec_driver_sql(INSERT_TRIGGER)
+
+
+def match_expression(text: str) -> Optional[str]:
+    """Turn free text from the search box into an FTS5 query.
+
+    Every word becomes a quoted prefix term, so operators and punctuation typed
+    by users can't break the query and "yog" already finds "Yoga".
+    """
+    terms = _TERM.findall(text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
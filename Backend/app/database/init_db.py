@@ -1,9 +1,13 @@
 from app.database.session import Base, engine
+from app.database.migrations import run_migrations
 from app.models.user import User  # noqa
 from app.models.event import Event  # noqa
+from app.models.archive import events_archive  # noqa
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=engine):
+    Base.metadata.create_all(bind=bind)
+    # Bring databases created by older versions up to the current schema
+    run_migrations(bind)
 
 if __name__ == "__main__":
     init_db()
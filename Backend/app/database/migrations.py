@@ -0,0 +1,69 @@
+"""In-place schema upgrades for existing databases.
+
+`Base.metadata.create_all` only creates missing tables, so changes to tables
+that already exist (new indexes, columns, triggers) are listed here. Each
+migration runs once, in order, and is recorded in `schema_migrations`. Write
+them to be idempotent (IF NOT EXISTS) since fresh databases already get the
+current schema from create_all.
+"""
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.archive import create_archive_tables
+from app.database.attendees import create_attendee_counter
+from app.database.fts import create_fts, rekey_fts
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _statements(*sql: str) -> Callable[[Connection], None]:
+    def upgrade(conn: Connection) -> None:
+        for statement in sql:
+            conn.execute(text(statement))
+    return upgrade
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "indexes for category, date and attendance lookups", _statements(
+        "CREATE INDEX IF NOT EXISTS ix_events_category_date ON events (category, date, start_time)",
+        "CREATE INDEX IF NOT EXISTS ix_events_date_start_time ON events (date, start_time, id)",
+        "CREATE INDEX IF NOT EXISTS ix_user_events_event_id ON user_events (event_id)",
+    )),
+    Migration(2, "full-text index over event title and description", create_fts),
+    Migration(3, "attendee counter maintained by user_events triggers", create_attendee_counter),
+    Migration(4, "full-text index keyed on stable integer keys instead of events rowids", rekey_fts),
+    Migration(5, "archive tables for past events and their bookings", create_archive_tables),
+]
+
+
+def current_version(conn: Connection) -> int:
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations, returns the versions applied."""
+    applied = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations "
+            "(version INTEGER PRIMARY KEY, description VARCHAR NOT NULL)"
+        ))
+        version = current_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        # One transaction per migration so a failure leaves earlier ones recorded
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:v, :d)"),
+                {"v": migration.version, "d": migration.description},
+            )
+        applied.append(migration.version)
+    return applied
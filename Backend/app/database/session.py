@@ -1,17 +1,100 @@
-from sqlalchemy import create_engine
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.config import Settings, settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+SQLALCHEMY_DATABASE_URL = settings.database_url
+READ_DATABASE_URL = settings.read_database_url or SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def _require_sqlite(url: str) -> None:
+    # Seat counts and search are kept up to date by SQLite triggers, on any
+    # other database they would silently never change
+    backend = make_url(url).get_backend_name()
+    if backend != "sqlite":
+        raise ValueError(f"Only SQLite databases are supported, got {backend!r}")
+
+
+def async_url(url: str) -> str:
+    return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, object], read_only: bool = False) -> None:
+    """Run the PRAGMAs on every new connection so none starts with SQLite defaults."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if value is not None:
+                cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def hold_write_lock(conn: Connection) -> None:
+    """Open a write transaction on `conn` unless one is already open.
+
+    pysqlite only begins a transaction at the first DML statement, so DDL or
+    reads issued before it would autocommit or run outside the transaction.
+    """
+    if not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def make_engine(url: str, config: Settings = settings, read_only: bool = False) -> Engine:
+    _require_sqlite(url)
+    engine = create_engine(
+        url, connect_args={"check_same_thread": False},
+        pool_size=config.pool_size, max_overflow=config.max_overflow, pool_timeout=config.pool_timeout,
+    )
+    apply_sqlite_pragmas(engine, config.sqlite_pragmas(), read_only)
+    return engine
+
+
+def make_async_engine(url: str, config: Settings = settings, read_only: bool = False) -> AsyncEngine:
+    # aiosqlite defaults to NullPool for files, which would open a new
+    # connection (and thread) per request, so keep a queue pool instead.
+    _require_sqlite(url)
+    engine = create_async_engine(
+        async_url(url), poolclass=AsyncAdaptedQueuePool,
+        pool_size=config.pool_size, max_overflow=config.max_overflow, pool_timeout=config.pool_timeout,
+    )
+    apply_sqlite_pragmas(engine.sync_engine, config.sqlite_pragmas(), read_only)
+    return engine
+
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async path used by async def routes and dependencies so a query never blocks
+# the event loop.
+async_engine = make_async_engine(SQLALCHEMY_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read-only engines for GET routes, they refuse writes even when pointed at the
+# primary database.
+read_engine = make_engine(READ_DATABASE_URL, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+async_read_engine = make_async_engine(READ_DATABASE_URL, read_only=True)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
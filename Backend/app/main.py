@@ -1,9 +1,30 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.routers import users, events
+from app.core.auth import principal_cache
+from app.core.cache import event_cache
+from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware, idempotency_store
+from app.core.seat_feed import seat_hub
+from app.core.log import configure_logging
+from app.core.metrics import Gauge, MetricsMiddleware, instrument_engine, registry
+from app.core.security import PasswordHasherBusy
+from app.database.session import engine, async_engine, read_engine, async_read_engine
+
+configure_logging(settings.log_level, settings.log_format)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Event Booking API")
 
+# Inside CORS, so replayed responses get the CORS headers of the retry's origin
+app.add_middleware(IdempotencyMiddleware, routes=[
+    ("POST", "/events/"),
+    ("POST", "/users/signup"),
+    ("PUT", "/users/{user_id}/updateUserEvents"),
+])
+
 # CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -11,11 +32,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers including Authorization
+    # Catalog pagination cursor, cache validators and idempotent replays
+    expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
 )
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    # Backpressure from the bcrypt pool: shed load instead of queueing forever
+    logger.warning("password hashing pool full, request shed", extra={"path": request.url.path})
+    return JSONResponse(status_code=503, content={"detail": "Server busy, retry shortly"}, headers={"Retry-After": "1"})
+
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(events.router, prefix="/events", tags=["events"])
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+def _cache_metrics():
+    entries = Gauge("cache_entries", "Entries held by the in-process caches.", ("cache",))
+    entries.set(("principal",), len(principal_cache))
+    entries.set(("idempotency",), len(idempotency_store))
+    counters = Gauge("event_cache_stats", "Event cache hits, misses, evictions, entries and bytes.", ("stat",))
+    for stat, value in event_cache.stats().items():
+        counters.set((stat,), value)
+    listeners = Gauge("seat_feed_subscribers", "Open live seat count streams.")
+    listeners.set((), len(seat_hub))
+    return entries, counters, listeners
+
+
+if settings.metrics_enabled:
+    # Added last so it wraps CORS too and times the whole request
+    app.add_middleware(MetricsMiddleware)
+    for name, e in (("primary", engine), ("primary_async", async_engine.sync_engine),
+                    ("read", read_engine), ("read_async", async_read_engine.sync_engine)):
+        instrument_engine(e, name, settings.slow_query_ms)
+    registry.add_collector(_cache_metrics)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
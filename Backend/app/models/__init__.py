@@ -1,2 +1,3 @@
 from .user import User  # noqa
 from .event import Event  # noqa
+from .archive import events_archive, user_events_archive  # noqa
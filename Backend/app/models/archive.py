@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Date, Time, Table, Index
+from app.database.session import Base
+
+# Past events and their bookings, moved out of the live tables by
+# app/database/archive.py. Same columns as events/user_events; nothing
+# writes to them but the archival job.
+events_archive = Table(
+    "events_archive",
+    Base.metadata,
+    Column("id", String, primary_key=True),
+    Column("title", String, nullable=False),
+    Column("description", String, nullable=True),
+    Column("category", String, nullable=True),
+    Column("max_attendees", Integer, nullable=False),
+    Column("current_attendees", Integer, nullable=False),
+    Column("date", Date, nullable=False),
+    Column("start_time", Time, nullable=False),
+    Column("end_time", Time, nullable=False),
+)
+
+user_events_archive = Table(
+    "user_events_archive",
+    Base.metadata,
+    Column("user_id", String, primary_key=True),
+    Column("event_id", String, primary_key=True),
+    Index("ix_user_events_archive_event_id", "event_id"),
+)
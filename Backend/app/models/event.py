@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Time
+from sqlalchemy import Column, String, Integer, Date, Time, Index
 from sqlalchemy.orm import relationship
 from app.database.session import Base
 import uuid
@@ -7,6 +7,12 @@ from .user import user_events  # circular-safe import for association table
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Category listings filter by category and sort by date/start time
+        Index("ix_events_category_date", "category", "date", "start_time"),
+        # Date range filters and the (date, start_time, id) catalog keyset order
+        Index("ix_events_date_start_time", "date", "start_time", "id"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
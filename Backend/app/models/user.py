@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Table, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Table, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.database.session import Base
 import uuid
@@ -9,6 +9,8 @@ user_events = Table(
     Base.metadata,
     Column("user_id", String, ForeignKey("users.id"), primary_key=True),
     Column("event_id", String, ForeignKey("events.id"), primary_key=True),
+    # The PK starts with user_id, event -> users lookups need their own index
+    Index("ix_user_events_event_id", "event_id"),
 )
 
 
@@ -1,34 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+import base64
+from datetime import date, time
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
-from app.database.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_db, get_async_read_db, ReadSessionLocal
+from app.models.archive import events_archive
 from app.models.event import Event
-from app.schemas.event import EventCreate, EventOut
-from app.models.user import User
-from app.core.security import decode_token
+from app.database.fts import fts_match, fts_rank, join_fts, match_expression
+from app.schemas.event import EventCreate, EventOut, EventImportResult
+from app.core.auth import get_current_user, require_admin
+from app.core.event_import import IMPORT_FORMATS, import_events
+from app.core.cache import CachedResponse, event_cache, event_key, invalidate_events, make_etag
+from app.core.serialization import ARCHIVE_EVENT_COLUMNS, EVENT_COLUMNS, dump_event, dump_events
+from app.core.seat_feed import seat_hub
+from app.core.config import settings
 
 router = APIRouter()
 
-async def require_auth(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = authorization.split(" ", 1)[1]
-    user_id = decode_token(token)
-    print('user_id:', user_id)
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
-
-@router.post("/", response_model=EventOut, status_code=201, dependencies=[Depends(require_auth)])
+@router.post("/", response_model=EventOut, status_code=201, dependencies=[Depends(get_current_user)])
 def create_event(payload: EventCreate, db: Session = Depends(get_db)):
     event = Event(
         title=payload.title,
         description=payload.description,
         category=payload.category,
         max_attendees=payload.max_attendees,
-        current_attendees=payload.current_attendees or 0,
+        # Attendance is only ever changed by bookings, never by the client
+        current_attendees=0,
         date=payload.date,
         start_time=payload.start_time,
         end_time=payload.end_time,
@@ -36,32 +37,265 @@ def create_event(payload: EventCreate, db: Session = Depends(get_db)):
     db.add(event)
     db.commit()
     db.refresh(event)
+    # A new event only shows up in its own category's listings
+    invalidate_events(categories=[event.category])
+    seat_hub.touch([event.id])
     return event
 
+@router.post("/import", response_model=EventImportResult, dependencies=[Depends(require_admin)])
+async def bulk_import_events(request: Request):
+    """Admin bulk import of a text/csv or application/x-ndjson body.
+
+    The body is parsed while it streams in and written in batched
+    transactions; rows that fail validation are listed in the report.
+    """
+    fmt = IMPORT_FORMATS.get(request.headers.get("content-type", "").split(";")[0].strip())
+    if fmt is None:
+        raise HTTPException(status_code=415, detail=f"Expected one of: {', '.join(IMPORT_FORMATS)}")
+    try:
+        return await import_events(request.stream(), fmt)
+    finally:
+        # Also after a failure, earlier chunks may already be committed
+        invalidate_events()
+
+# Catalog ordering used for keyset pagination, id breaks ties between events
+# sharing the same slot.
+CATALOG_ORDER = (Event.date, Event.start_time, Event.id)
+STREAM_BATCH_SIZE = 1000
+
+
+async def _cached_json(key: str, if_none_match: Optional[str], build) -> Response:
+    """Serve `key` from the event cache, calling `build` on a miss.
+
+    `build` returns the JSON body and any extra headers; errors it raises are
+    not cached. Clients presenting the current ETag get an empty 304.
+    """
+    cached = event_cache.get(key)
+    if cached is None:
+        generation = event_cache.generation
+        body, headers = await build()
+        cached = CachedResponse(body, make_etag(body), headers)
+        event_cache.set(key, cached, generation)
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache", **cached.headers}
+    if if_none_match and (if_none_match.strip() == "*" or cached.etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _encode_cursor(event: Event) -> str:
+    raw = f"{event.date.isoformat()}|{event.start_time.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        day, start, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 2)
+        return date.fromisoformat(day), time.fromisoformat(start), event_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _decode_offset(cursor: str) -> int:
+    try:
+        kind, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        if kind != "offset" or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _encode_offset(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset|{offset}".encode()).decode()
+
+
+async def keyset_page(db: AsyncSession, query, limit: Optional[int], cursor: Optional[str], order=CATALOG_ORDER):
+    """Run `query` (selecting EVENT_COLUMNS) in catalog order from `cursor`, returns (rows, extra headers).
+
+    `order` is the (date, start_time, id) columns of whatever `query` selects from.
+    """
+    query = query.order_by(*order)
+    if cursor:
+        query = query.where(tuple_(*order) > tuple_(*_decode_cursor(cursor)))
+    if limit:
+        query = query.limit(limit)
+    events = (await db.execute(query)).all()
+    headers = {}
+    # A full page means there may be more, hand out the cursor for the next one
+    if limit and len(events) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(events[-1])
+    return events, headers
+
+
+def _stream_events():
+    # The request scoped session is closed before a streamed body is sent, so
+    # the export owns its session and pulls rows in batches from the cursor.
+    with ReadSessionLocal() as db:
+        rows = db.execute(
+            select(*EVENT_COLUMNS).order_by(*CATALOG_ORDER).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for batch in rows.partitions():
+            yield b"".join(dump_event(row) + b"\n" for row in batch)
+
+
 @router.get("/getAllEvents", response_model=list[EventOut])
-def get_all_events(db: Session = Depends(get_db)):
-    events = db.query(Event).all()
-    if not events:
-        raise HTTPException(status_code=404, detail="No events found")
-    for event in events:
-        event.attendeeCount = len(event.users)
-    return events
+async def get_all_events(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if stream:
+        return StreamingResponse(_stream_events(), media_type="application/x-ndjson")
+
+    async def build():
+        # Attendance comes from the stored current_attendees counter, loading
+        # event.users here would cost one extra query per event.
+        events, headers = await keyset_page(db, select(*EVENT_COLUMNS), limit, cursor)
+        if not events and not cursor:
+            raise HTTPException(status_code=404, detail="No events found")
+        return dump_events(events), headers
+
+    return await _cached_json(f"all:{limit}:{cursor}", if_none_match, build)
 
 @router.get('/get_by_category/{categories}', response_model=list[EventOut])
-def get_events_by_category(categories: str, db: Session = Depends(get_db)):
+async def get_events_by_category(categories: str, if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_read_db)):
     # Split categories by comma and strip whitespace
-    category_list = [cat.strip() for cat in categories.split(',')]
-    
-    events = db.query(Event).filter(Event.category.in_(category_list)).all()
-    if not events:
-        raise HTTPException(status_code=404, detail="No events found for the specified categories")
-    for event in events:
-        event.attendeeCount = len(event.users)
-    return events
+    category_list = sorted({cat.strip() for cat in categories.split(',')})
+
+    async def build():
+        query = select(*EVENT_COLUMNS).where(Event.category.in_(category_list)).order_by(*CATALOG_ORDER)
+        events = (await db.execute(query)).all()
+        if not events:
+            raise HTTPException(status_code=404, detail="No events found for the specified categories")
+        return dump_events(events), {}
+
+    return await _cached_json("category:" + ",".join(category_list), if_none_match, build)
+
+@router.get("/search", response_model=list[EventOut])
+async def search_events(
+    q: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    start_from: Optional[time] = Query(None, alias="startFrom"),
+    start_to: Optional[time] = Query(None, alias="startTo"),
+    category: Optional[str] = None,
+    has_free_seats: bool = Query(False, alias="hasFreeSeats"),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Upcoming events by text, date range, start time of day, category and free seats.
+
+    `from` defaults to today. Without `q` results are in catalog order and
+    paginated like getAllEvents; the date and category filters are served by
+    the (date, start_time) and (category, date) indexes. With `q` the words are
+    prefix-matched against the events_fts index and results are ranked by
+    bm25, paginated by offset.
+    """
+    date_from = date_from or date.today()
+    category_list = sorted({cat.strip() for cat in category.split(',')}) if category else []
+
+    async def build():
+        query = select(*EVENT_COLUMNS).where(Event.date >= date_from)
+        if date_to:
+            query = query.where(Event.date <= date_to)
+        if start_from:
+            query = query.where(Event.start_time >= start_from)
+        if start_to:
+            query = query.where(Event.start_time <= start_to)
+        if category_list:
+            query = query.where(Event.category.in_(category_list))
+        if has_free_seats:
+            query = query.where(Event.current_attendees < Event.max_attendees)
+        if q is not None:
+            match = match_expression(q)
+            if not match:
+                return b"[]", {}
+            offset = _decode_offset(cursor) if cursor else 0
+            query = (
+                join_fts(query)
+                .where(fts_match(match))
+                .order_by(fts_rank, Event.id)
+                .offset(offset)
+                .limit(limit)
+            )
+            events = (await db.execute(query)).all()
+            headers = {"X-Next-Cursor": _encode_offset(offset + limit)} if len(events) == limit else {}
+        else:
+            events, headers = await keyset_page(db, query, limit, cursor)
+        return dump_events(events), headers
+
+    key = f"search:{q}:{date_from}:{date_to}:{start_from}:{start_to}:{','.join(category_list)}:{has_free_seats}:{limit}:{cursor}"
+    return await _cached_json(key, if_none_match, build)
 
 @router.get("/get_by_id/{event_id}", response_model=EventOut)
-def get_event(event_id: str, db: Session = Depends(get_db)):
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    return event
+async def get_event(
+    event_id: str,
+    include_archived: bool = Query(False, alias="includeArchived"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    async def build():
+        event = (await db.execute(select(*EVENT_COLUMNS).where(Event.id == event_id))).first()
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return dump_event(event), {}
+
+    async def build_archived():
+        event = (await db.execute(select(*ARCHIVE_EVENT_COLUMNS).where(events_archive.c.id == event_id))).first()
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return dump_event(event), {}
+
+    try:
+        return await _cached_json(event_key(event_id), if_none_match, build)
+    except HTTPException:
+        if not include_archived:
+            raise
+    # Archived events never change, no write has to invalidate this entry
+    return await _cached_json(f"archived:{event_id}", if_none_match, build_archived)
+
+# Longest eventIds list a seat stream accepts
+SEAT_STREAM_MAX_EVENTS = 1000
+
+
+async def _seat_events(event_ids, categories):
+    # Server-Sent Events: a comment line keeps idle connections (and proxies)
+    # alive, `resync` asks the client to refetch after it fell too far behind.
+    # Subscribing here means the generator's finally always unsubscribes, also
+    # when a client disconnect cancels the body, and all on the event loop.
+    sub = seat_hub.subscribe(event_ids, categories)
+    try:
+        yield b": connected\n\n"
+        while True:
+            seats = await sub.next(timeout=settings.seat_feed_heartbeat)
+            if seats is None:
+                yield b": ping\n\n"
+            elif sub.overflowed:
+                sub.resynced()
+                yield b"event: resync\ndata: {}\n\n"
+            elif seats:
+                yield b"event: seats\ndata: " + orjson.dumps(seats) + b"\n\n"
+    finally:
+        seat_hub.unsubscribe(sub)
+
+@router.get("/seats/stream")
+async def stream_seats(event_ids: Optional[str] = Query(None, alias="eventIds"), category: Optional[str] = None):
+    """Live seat counts as Server-Sent Events.
+
+    Subscribe to comma separated `eventIds` and/or `category` names, or to
+    every event when neither is given. Each `seats` message carries the
+    current id, category, current_attendees and max_attendees of the events
+    that changed since the last one.
+    """
+    id_list = {e.strip() for e in event_ids.split(",") if e.strip()} if event_ids else set()
+    category_list = {c.strip() for c in category.split(",") if c.strip()} if category else set()
+    if len(id_list) > SEAT_STREAM_MAX_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {SEAT_STREAM_MAX_EVENTS} eventIds per stream")
+    return StreamingResponse(
+        _seat_events(id_list, category_list), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
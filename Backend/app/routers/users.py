@@ -1,30 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, union_all
 from sqlalchemy.orm import Session
-from app.database.session import get_db
-from app.models.user import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.session import get_db, get_async_db, get_async_read_db, ReadSessionLocal
+from app.models.user import User, user_events
 from app.models.event import Event
-from app.schemas.user import UserCreate, UserOut, UserUpdateEvent, SignUpRequest, LoginRequest, AuthResponse
+from app.models.archive import events_archive, user_events_archive
+from app.schemas.user import (
+    UserCreate, UserOut, UserUpdateEvent, UserEventsUpdateOut, ScheduleConflict, SignUpRequest, LoginRequest, AuthResponse,
+)
 from app.schemas.event import EventOut
-from app.core.security import hash_password, verify_password, decode_token, create_access_token
-from fastapi import Header
-from typing import List
+from app.core.security import hash_password, hash_password_async, verify_and_update_password, create_access_token
+from app.core.auth import get_current_user
+from app.core.booking import BookingUpdate, commit_booking
+from app.core.booking_queue import booking_queue
+from app.core.schedule import Slot, schedule_conflicts, user_slots_query
+from app.core.config import settings
+from app.core.serialization import ARCHIVE_EVENT_COLUMNS, EVENT_COLUMNS, EVENT_FIELDS, dump_events
+from app.core.cache import invalidate_events
+from app.core.seat_feed import seat_hub
+from app.core.ical import ICS_COLUMNS, ICS_FOOTER, ICS_HEADER, ics_event, ics_stamp
+from app.routers.events import CATALOG_ORDER, STREAM_BATCH_SIZE, keyset_page
+from typing import List, Optional
 
 router = APIRouter()
 
-# Simple token auth using Authorization: Bearer <userId> for demo (should use JWT in prod)
-async def get_current_user(authorization: str = Header(None, alias="Authorization"), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        print('logger info: ', authorization)
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = authorization.split(" ", 1)[1]
-    user_id = decode_token(token)
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
-
 @router.post("/", response_model=UserOut, status_code=201)
 def create_user(payload: UserCreate, db: Session = Depends(get_db)):
     existing = db.query(User).filter(User.id == payload.userId).first()
@@ -49,77 +52,159 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/signup", response_model=AuthResponse, status_code=201)
-def signup(payload: SignUpRequest, db: Session = Depends(get_db)):
+async def signup(payload: SignUpRequest, db: AsyncSession = Depends(get_async_db)):
     # Ensure unique user_name
-    existing = db.query(User).filter(User.user_name == payload.username).first()
+    existing = await db.scalar(select(User).where(User.user_name == payload.username))
     if existing:
         raise HTTPException(status_code=400, detail="Username already taken")
-    user = User(user_name=payload.username, password_hash=hash_password(payload.password))
+    # Hashing runs on the bounded bcrypt pool, the event loop stays free meanwhile
+    user = User(user_name=payload.username, password_hash=await hash_password_async(payload.password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     token = create_access_token(user.id)
     return AuthResponse(accessToken=token, userId=user.id, userName=user.user_name, accessLevel=user.access_level)
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_name == payload.username).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.user_name == payload.username))
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password(payload.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with an old cost factor, upgrade it now that we have the password
+        user.password_hash = new_hash
+        await db.commit()
     token = create_access_token(user.id)
     return AuthResponse(accessToken=token, userId=user.id, userName=user.user_name, accessLevel=user.access_level)
 
+def _itinerary(columns, user_id: str, date_from: Optional[date], date_to: Optional[date]):
+    # Starts from the user's rows in the user_events primary key, then one
+    # events lookup per booking
+    query = select(*columns).join(user_events, user_events.c.event_id == Event.id).where(user_events.c.user_id == user_id)
+    if date_from:
+        query = query.where(Event.date >= date_from)
+    if date_to:
+        query = query.where(Event.date <= date_to)
+    return query
+
+
+def _archived_itinerary(user_id: str, date_from: Optional[date], date_to: Optional[date]):
+    query = (
+        select(*ARCHIVE_EVENT_COLUMNS)
+        .join(user_events_archive, user_events_archive.c.event_id == events_archive.c.id)
+        .where(user_events_archive.c.user_id == user_id)
+    )
+    if date_from:
+        query = query.where(events_archive.c.date >= date_from)
+    if date_to:
+        query = query.where(events_archive.c.date <= date_to)
+    return query
+
+
 @router.get("/{user_id}/getUserEvents", response_model=List[EventOut])
-def get_user_events(user_id: str, db: Session = Depends(get_db), current=Depends(get_current_user)):
+async def get_user_events(
+    user_id: str,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_archived: bool = Query(False, alias="includeArchived"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current=Depends(get_current_user),
+):
+    """The user's bookings in catalog order, optionally within `from`/`to` dates.
+
+    Paginated like getAllEvents. The token already proved the user exists, so
+    this is the only query. `includeArchived` adds the archived past bookings.
+    """
     if current.id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Return all events associated with this user
-    return user.events
+    query, order = _itinerary(EVENT_COLUMNS, user_id, date_from, date_to), CATALOG_ORDER
+    if include_archived:
+        both = union_all(query, _archived_itinerary(user_id, date_from, date_to)).subquery()
+        query = select(*(both.c[name] for name in EVENT_FIELDS))
+        order = (both.c.date, both.c.start_time, both.c.id)
+    events, headers = await keyset_page(db, query, limit, cursor, order)
+    return Response(content=dump_events(events), media_type="application/json", headers=headers)
+
+
+def _stream_itinerary(user_id: str, date_from: Optional[date], date_to: Optional[date]):
+    # Owns its session like the getAllEvents export, the request's is closed
+    # before the body is sent
+    stamp = ics_stamp()
+    yield ICS_HEADER
+    with ReadSessionLocal() as db:
+        rows = db.execute(
+            _itinerary(ICS_COLUMNS, user_id, date_from, date_to)
+            .order_by(*CATALOG_ORDER).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for batch in rows.partitions():
+            yield b"".join(ics_event(row, stamp) for row in batch)
+    yield ICS_FOOTER
+
 
-@router.put("/{user_id}/updateUserEvents", response_model=UserOut)
-def update_user_events(user_id: str, payload: UserUpdateEvent, db: Session = Depends(get_db), current=Depends(get_current_user)):
+@router.get("/{user_id}/events.ics")
+async def export_user_events(
+    user_id: str,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    current=Depends(get_current_user),
+):
+    """The user's bookings as an iCalendar file, streamed in batches."""
     if current.id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    return StreamingResponse(
+        _stream_itinerary(user_id, date_from, date_to), media_type="text/calendar",
+        headers={"Content-Disposition": 'attachment; filename="events.ics"'},
+    )
 
-    # Add events
-    if payload.addEventIds:
-        events_to_add = db.query(Event).filter(Event.id.in_(payload.addEventIds)).all()
-        missing = set(payload.addEventIds) - {e.id for e in events_to_add}
-        if missing:
-            raise HTTPException(status_code=404, detail=f"Events not found: {','.join(missing)}")
-        for e in events_to_add:
-            if e not in user.events:
-                user.events.append(e)
-                # Increment current_attendees count
-                e.current_attendees += 1
-
-    # Remove events
-    if payload.removeEventIds:
-        events_to_remove = db.query(Event).filter(Event.id.in_(payload.removeEventIds)).all()
-        for e in events_to_remove:
-            if e in user.events:
-                # Decrement current_attendees count
-                e.current_attendees = max(0, e.current_attendees - 1)
-        user.events = [e for e in user.events if e.id not in set(payload.removeEventIds)]
+@router.put("/{user_id}/updateUserEvents", response_model=UserEventsUpdateOut)
+async def update_user_events(user_id: str, payload: UserUpdateEvent, current=Depends(get_current_user)):
+    if current.id != user_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
 
-    db.commit()
-    db.refresh(user)
-    return UserOut(id=user.id, userName=user.user_name, eventIds=[e.id for e in user.events])
+    # Seats are claimed with conditional updates; if any event is unknown or
+    # full the whole request is rolled back.
+    strict = settings.schedule_strict if payload.strict is None else payload.strict
+    change = BookingUpdate(user_id, payload.addEventIds or [], payload.removeEventIds or [], strict)
+    if settings.booking_queue:
+        result = await booking_queue.submit(change)
+    else:
+        result = await run_in_threadpool(commit_booking, change)
+    if result.missing:
+        raise HTTPException(status_code=404, detail=f"Events not found: {','.join(result.missing)}")
+    if result.sold_out:
+        raise HTTPException(status_code=409, detail=f"Events sold out: {','.join(result.sold_out)}")
+    conflicts = [ScheduleConflict(eventId=c.event_id, conflictingEventId=c.conflicting_event_id, date=c.date)
+                 for c in result.conflicts]
+    if not result.ok:
+        pairs = ",".join(f"{c.eventId}/{c.conflictingEventId}" for c in conflicts)
+        raise HTTPException(status_code=409, detail=f"Schedule conflicts: {pairs}")
+
+    # Re-adding held events or removing unbooked ones changes nothing
+    if result.changed:
+        invalidate_events(result.changed)
+        seat_hub.touch(result.changed)
+    return UserEventsUpdateOut(id=user_id, userName=current.user_name, eventIds=result.event_ids, conflicts=conflicts)
+
+@router.get("/{user_id}/conflicts", response_model=List[ScheduleConflict])
+async def get_user_conflicts(user_id: str, db: AsyncSession = Depends(get_async_read_db), current=Depends(get_current_user)):
+    """Every pair of the user's bookings that overlap in time, by date."""
+    if current.id != user_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    slots = [Slot(*row) for row in await db.execute(user_slots_query(user_id))]
+    return [ScheduleConflict(eventId=c.event_id, conflictingEventId=c.conflicting_event_id, date=c.date)
+            for c in schedule_conflicts(slots)]
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: str, db: Session = Depends(get_db), current=Depends(get_current_user)):
+async def get_user(user_id: str, db: AsyncSession = Depends(get_async_read_db), current=Depends(get_current_user)):
     if current.id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserOut(id=user.id, userName=user.user_name, eventIds=[e.id for e in user.events])
-
+    event_ids = await db.scalars(select(user_events.c.event_id).where(user_events.c.user_id == user_id))
+    return UserOut(id=user.id, userName=user.user_name, eventIds=event_ids.all())
@@ -1,13 +1,12 @@
 from pydantic import BaseModel
 from datetime import date, time
-from typing import Optional
+from typing import List, Optional
 
 class EventCreate(BaseModel):
     title: str
     description: Optional[str] = None
     category: Optional[str] = None
     max_attendees: int
-    current_attendees: Optional[int] = 0
     date: date
     start_time: time
     end_time: time
@@ -25,3 +24,14 @@ class EventOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    line: int
+    errors: List[str]
+
+class EventImportResult(BaseModel):
+    inserted: int
+    failed: int
+    # Capped, see IMPORT_MAX_REPORTED_ERRORS in app/core/event_import.py
+    errors: List[ImportRowError] = []
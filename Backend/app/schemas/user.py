@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import date
 from typing import List, Optional
 
 class UserCreate(BaseModel):
@@ -18,6 +19,17 @@ class UserOut(BaseModel):
 class UserUpdateEvent(BaseModel):
     addEventIds: Optional[List[str]] = None
     removeEventIds: Optional[List[str]] = None
+    # Reject bookings that overlap another one, defaults to SCHEDULE_STRICT
+    strict: Optional[bool] = None
+
+class ScheduleConflict(BaseModel):
+    eventId: str
+    conflictingEventId: str
+    date: date
+
+class UserEventsUpdateOut(UserOut):
+    # Overlaps created by this update (it went through since strict mode was off)
+    conflicts: List[ScheduleConflict] = []
 
 
 class SignUpRequest(BaseModel):
@@ -0,0 +1,95 @@
+"""Compare request latency of the async database path against the old sync-in-async auth.
+
+Before the async stack, `get_current_user` was an `async def` running sync
+`db.query(User)` calls on the event loop, so every in-flight request stalled
+while one query ran. This fires concurrent GET /users/{userId} requests at the
+current app and at a copy of that route wired the old way, and reports p50/p99.
+
+Keep concurrency under the sync pool size (15): above it the old wiring blocks
+the loop waiting for a connection that only the loop can release, and hangs
+until the pool timeout.
+
+Run with: python -m tests.bench_async_db [requests] [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI, Header, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.main import app
+from app.database.init_db import init_db
+from app.database.session import SessionLocal, get_db
+from app.models.user import User
+from app.schemas.user import UserOut
+from app.core.security import create_access_token, decode_token
+
+legacy_app = FastAPI()
+
+
+async def legacy_current_user(authorization: str = Header(None), db: Session = Depends(get_db)) -> User:
+    # Blocking query on the event loop, as the auth dependencies used to do
+    user_id = decode_token(authorization.split(" ", 1)[1])
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+@legacy_app.get("/users/{user_id}", response_model=UserOut)
+def legacy_get_user(user_id: str, db: Session = Depends(get_db), current=Depends(legacy_current_user)):
+    user = db.query(User).filter(User.id == user_id).first()
+    return UserOut(id=user.id, userName=user.user_name, eventIds=[e.id for e in user.events])
+
+
+def seed_user() -> str:
+    user_id = f"bench-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    return user_id
+
+
+async def run(target, user_id: str, requests: int, concurrency: int):
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=target), base_url="http://bench") as client:
+        async def one():
+            async with gate:
+                started = time.perf_counter()
+                r = await client.get(f"/users/{user_id}", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert r.status_code == 200, r.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "req_per_s": requests / elapsed,
+    }
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    init_db()
+    user_id = seed_user()
+    print(f"{requests} requests, {concurrency} concurrent")
+    for name, target in (("sync get_db", legacy_app), ("async session", app)):
+        result = asyncio.run(run(target, user_id, requests, concurrency))
+        print(f" - {name:14} p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  {result['req_per_s']:7.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
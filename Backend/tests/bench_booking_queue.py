@@ -0,0 +1,95 @@
+"""Bookings per second with and without the group-commit booking queue.
+
+Fires concurrent PUT /users/{userId}/updateUserEvents calls (one booking each,
+spread over a few events with plenty of seats) through the ASGI app, first on
+the per-request commit path and then with BOOKING_QUEUE enabled. Each mode gets
+fresh users and events so both do the same work.
+
+Commits only hit the disk with SQLITE_SYNCHRONOUS=FULL, run with that set to
+see the fsync savings on top of the write lock contention.
+
+Run with: python -m tests.bench_booking_queue [bookings] [concurrency]
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import date, time as dtime
+
+import httpx
+from sqlalchemy import insert
+
+from app.main import app
+from app.core import booking_queue as queue_module
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.event import Event
+from app.models.user import User
+
+EVENTS = 10
+
+
+def seed(bookings: int):
+    users = [f"bench-{uuid.uuid4()}" for _ in range(bookings)]
+    events = [str(uuid.uuid4()) for _ in range(EVENTS)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"id": u, "user_name": u, "password_hash": "x"} for u in users])
+        db.execute(insert(Event), [
+            {"id": e, "title": "On sale", "category": "Bench", "max_attendees": bookings, "current_attendees": 0,
+             "date": date(2031, 1, 1), "start_time": dtime(20, 0), "end_time": dtime(23, 0)}
+            for e in events
+        ])
+        db.commit()
+    return users, events
+
+
+async def run(users, events, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def book(i: int, user_id: str):
+            async with gate:
+                r = await client.put(f"/users/{user_id}/updateUserEvents",
+                                     json={"addEventIds": [events[i % len(events)]]},
+                                     headers={"Authorization": f"Bearer {create_access_token(user_id)}"})
+            return r.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*[book(i, u) for i, u in enumerate(users)])
+        elapsed = time.perf_counter() - started
+    failed = len(statuses) - statuses.count(200)
+    return elapsed, failed
+
+
+async def compare(bookings: int, concurrency: int):
+    batch_sizes = []
+    apply_batch = queue_module.apply_batch
+
+    def recording_apply_batch(changes):
+        batch_sizes.append(len(changes))
+        return apply_batch(changes)
+
+    queue_module.apply_batch = recording_apply_batch
+    print(f"{bookings} bookings, concurrency {concurrency}, synchronous={settings.sqlite_synchronous}")
+    for label, queued in (("per-request commit", False), ("group commit", True)):
+        settings.booking_queue = queued
+        users, events = seed(bookings)
+        elapsed, failed = await run(users, events, concurrency)
+        line = f"{label:>20}: {bookings / elapsed:8,.0f} bookings/s ({elapsed:.2f}s, {failed} failed)"
+        if queued and batch_sizes:
+            line += f", {len(batch_sizes)} transactions, avg batch {sum(batch_sizes) / len(batch_sizes):.1f}"
+        print(line)
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    init_db()
+    # One loop for both modes, the async engine's pool is bound to it
+    asyncio.run(compare(bookings, concurrency))
+
+
+if __name__ == "__main__":
+    main()
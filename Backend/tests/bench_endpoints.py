@@ -0,0 +1,231 @@
+"""Latency and throughput of every API endpoint on a generated dataset.
+
+Builds a fresh database with the load_testDB generator, then drives each
+endpoint through the ASGI app with concurrent clients and records p50/p95/p99
+latency and throughput. Results are written to a JSON file (sorted keys, one
+entry per endpoint) so runs from two releases can be diffed, or compared
+directly with --compare.
+
+The dataset, the request mix and the random choices are all seeded, so two runs
+on the same machine send the same requests. Password hashing endpoints
+(createUser, signup, login) get a tenth of the requests, bcrypt makes them
+orders of magnitude slower by design.
+
+Run with: python -m tests.bench_endpoints [--users 20000] [--events 5000] [--bookings 100000]
+              [--requests 500] [--concurrency 50] [--out bench-endpoints.json] [--compare old.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="comma separated endpoint names")
+    parser.add_argument("--out", default="bench-endpoints.json")
+    parser.add_argument("--compare", help="earlier results file to print the changes against")
+    return parser.parse_args()
+
+
+def percentile(sorted_ms, pct: float) -> float:
+    if len(sorted_ms) == 1:
+        return sorted_ms[0]
+    return statistics.quantiles(sorted_ms, n=100, method="inclusive")[int(pct) - 1]
+
+
+class Scenario:
+    def __init__(self, name, method, request, ok=(200,), share=1.0):
+        self.name = name
+        self.method = method
+        # request(i) -> (url, extra httpx kwargs) for the i-th call
+        self.request = request
+        self.ok = ok
+        self.share = share
+
+
+def scenarios(ctx, rng: random.Random):
+    users, events = ctx["users"], ctx["events"]
+    user = lambda i: f"gen-user-{(i * 7919) % users}"
+    event = lambda i: f"gen-event-{rng.randrange(events)}"
+    auth = ctx["auth"]
+    new_event = {"title": "Bench event", "category": "Cat 1", "max_attendees": 10,
+                 "date": str(date.today() + timedelta(days=30)), "start_time": "18:00:00", "end_time": "19:00:00"}
+    import_body = "title,category,max_attendees,date,start_time,end_time\n" + "".join(
+        f"Imported {n},Cat 2,20,{date.today() + timedelta(days=60)},10:00,11:00\n" for n in range(100)
+    )
+    run_id = uuid.uuid4().hex[:8]
+
+    return [
+        Scenario("health", "GET", lambda i: ("/health", {})),
+        Scenario("getAllEvents", "GET", lambda i: ("/events/getAllEvents?limit=50", {})),
+        Scenario("getAllEvents.cursor", "GET", lambda i: (f"/events/getAllEvents?limit=50&cursor={ctx['cursor']}", {})),
+        Scenario("getAllEvents.stream", "GET", lambda i: ("/events/getAllEvents?stream=true", {}), share=0.1),
+        Scenario("get_by_category", "GET", lambda i: (f"/events/get_by_category/Cat {1 + i % 20}", {})),
+        Scenario("get_by_id", "GET", lambda i: (f"/events/get_by_id/{event(i)}", {})),
+        Scenario("search.filters", "GET",
+                 lambda i: (f"/events/search?category=Cat {1 + i % 20}&hasFreeSeats=true&startFrom=12:00", {})),
+        Scenario("search.text", "GET", lambda i: (f"/events/search?q={rng.choice(ctx['words'])}", {})),
+        Scenario("getUser", "GET", lambda i: (f"/users/{user(i)}", {"headers": auth(user(i))})),
+        Scenario("getUserEvents", "GET", lambda i: (f"/users/{user(i)}/getUserEvents", {"headers": auth(user(i))})),
+        Scenario("updateUserEvents", "PUT", lambda i: (
+            f"/users/{user(i)}/updateUserEvents",
+            {"headers": auth(user(i)), "json": {"addEventIds": [event(i)]}},
+        ), ok=(200, 409)),
+        Scenario("createEvent", "POST", lambda i: ("/events/", {"headers": auth(user(i)), "json": new_event}), ok=(201,)),
+        Scenario("importEvents", "POST", lambda i: (
+            "/events/import", {"headers": {**auth(ctx["admin"]), "Content-Type": "text/csv"}, "content": import_body},
+        ), share=0.1),
+        Scenario("createUser", "POST", lambda i: ("/users/", {"json": {
+            "userId": f"bench-{run_id}-{i}", "userName": f"bench-{run_id}-{i}", "password": "secret"}}),
+            ok=(201,), share=0.1),
+        Scenario("signup", "POST", lambda i: ("/users/signup", {"json": {
+            "username": f"signup-{run_id}-{i}", "password": "secret"}}), ok=(201,), share=0.1),
+        Scenario("login", "POST", lambda i: ("/users/login", {"json": {
+            "username": user(i), "password": ctx["password"]}}), share=0.1),
+    ]
+
+
+async def measure(client, scenario: Scenario, requests: int, concurrency: int):
+    count = max(1, int(requests * scenario.share))
+    gate = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], Counter()
+
+    async def one(i: int):
+        url, kwargs = scenario.request(i)
+        async with gate:
+            started = time.perf_counter()
+            r = await client.request(scenario.method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+        statuses[r.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(count)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": count,
+        # Unexpected statuses, e.g. 503 from the bcrypt pool's backpressure
+        "errors": sum(n for code, n in statuses.items() if code not in scenario.ok),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "throughput_rps": round(count / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def run(args, ctx):
+    import httpx
+    from app.main import app
+    from app.database.session import async_engine, async_read_engine
+
+    rng = random.Random(args.seed)
+    only = set(args.only.split(",")) if args.only else None
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        first = await client.get("/events/getAllEvents?limit=50")
+        ctx["cursor"] = first.headers["X-Next-Cursor"]
+        for scenario in scenarios(ctx, rng):
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = stats = await measure(client, scenario, args.requests, args.concurrency)
+            print(f"{scenario.name:>20}: {stats['throughput_rps']:8.1f} req/s  p50 {stats['p50_ms']:8.2f}ms"
+                  f"  p95 {stats['p95_ms']:8.2f}ms  p99 {stats['p99_ms']:8.2f}ms  errors {stats['errors']}")
+    for e in (async_engine, async_read_engine):
+        await e.dispose()
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(results, path: str):
+    with open(path) as f:
+        before = json.load(f)["endpoints"]
+    print(f"\nChange against {path} (throughput, p99):")
+    for name, now in results.items():
+        if name in before:
+            old = before[name]
+            rps = (now["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100
+            p99 = (now["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100
+            print(f"{name:>20}: {rps:+7.1f}% req/s  {p99:+7.1f}% p99")
+
+
+def main():
+    args = parse_args()
+    # Point the app at a throwaway database before it is imported, engines are
+    # created from the environment at import time
+    workdir = tempfile.mkdtemp(prefix="bench-endpoints-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.pop("READ_DATABASE_URL", None)
+
+    from sqlalchemy import insert
+    from app.core.security import create_access_token
+    from app.database.init_db import init_db
+    from app.database.session import engine
+    from app.models.user import User
+    from tests.load_testDB import GENERATED_PASSWORD, TOPICS, generate
+
+    init_db()
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        dataset = generate(conn, args.users, args.events, args.bookings, seed=args.seed)
+        conn.execute(insert(User).values(id="bench-admin", user_name="bench-admin", password_hash="x", access_level="admin"))
+    print(f"Generated {dataset} in {time.perf_counter() - started:.1f}s, "
+          f"{args.requests} requests per endpoint at concurrency {args.concurrency}")
+
+    tokens = {}
+
+    def auth(user_id: str):
+        if user_id not in tokens:
+            tokens[user_id] = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+        return tokens[user_id]
+
+    ctx = {"users": args.users, "events": args.events, "auth": auth, "admin": "bench-admin",
+           "password": GENERATED_PASSWORD, "words": [t.lower() for t in TOPICS]}
+    results = asyncio.run(run(args, ctx))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": dataset,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "endpoints": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Results written to {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Latency of full-text event search at catalog scale: FTS5 MATCH vs LIKE.
+
+Builds a throwaway database with synthetic events (the FTS index is filled by
+the insert trigger), then times prefix queries the Angular search box would
+send while the user types.
+
+LIKE '%term%' has to scan the table and can't rank; it only looks fast for
+very common prefixes where the first 20 rows it meets already match. FTS
+ranks every match, so selective words are cheap and one or two letter
+prefixes cost the most.
+
+Run with: python -m tests.bench_fts [events]
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+from sqlalchemy import and_, insert, or_, select
+
+from app.core.config import Settings
+from app.database.fts import fts_match, fts_rank, join_fts, match_expression
+from app.database.init_db import init_db
+from app.database.session import make_engine
+from app.models.event import Event
+
+SYLLABLES = "ba be bi bo bu ka ke ki ko ku la le li lo lu ma me mi mo mu na ne ni no nu ra re ri ro ru sa se si so su ta te ti to tu".split()
+# A realistic vocabulary is large, so individual words are selective
+VOCABULARY = sorted({"".join(random.Random(i).choices(SYLLABLES, k=3 + i % 3)) for i in range(20000)})
+BATCH = 10000
+BATCH = 10000
+
+
+def seed(engine, count: int):
+    rng = random.Random(7)
+    words = VOCABULARY
+    start = date.today()
+    for offset in range(0, count, BATCH):
+        rows = []
+        for _ in range(min(BATCH, count - offset)):
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "title": " ".join(rng.sample(words, 3)).title(),
+                "description": " ".join(rng.choices(words, k=20)),
+                "category": f"Cat {rng.randint(1, 20)}",
+                "max_attendees": 50, "current_attendees": 0,
+                "date": start + timedelta(days=rng.randint(0, 365)),
+                "start_time": dtime(rng.randint(6, 21)), "end_time": dtime(22),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(Event), rows)
+
+
+def timed(engine, stmt, repeat: int = 5) -> float:
+    samples = []
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{Path(tmp) / 'fts.db'}", Settings())
+        init_db(engine)
+        started = time.perf_counter()
+        seed(engine, count)
+        print(f"{count} events seeded in {time.perf_counter() - started:.1f}s (FTS kept in sync by trigger)")
+        rng = random.Random(11)
+        picks = rng.sample(VOCABULARY, 6)
+        queries = [picks[0], picks[1][:4], picks[2][:3], f"{picks[3]} {picks[4]}", picks[5][:2]]
+        for q in queries:
+            fts = (
+                join_fts(select(Event))
+                .where(fts_match(match_expression(q))).order_by(fts_rank).limit(20)
+            )
+            like = select(Event).where(and_(*(
+                or_(Event.title.ilike(f"%{w}%"), Event.description.ilike(f"%{w}%")) for w in q.split()
+            ))).limit(20)
+            print(f" - {q!r:22} fts {timed(engine, fts):8.2f} ms   like {timed(engine, like):8.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
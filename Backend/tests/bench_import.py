@@ -0,0 +1,61 @@
+"""Throughput of the bulk import endpoint.
+
+Streams a generated CSV body to POST /events/import through the ASGI app and
+reports rows per second end to end (parsing, validation and inserts).
+
+Run with: python -m tests.bench_import [rows]
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import insert
+
+from app.main import app
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from app.core.security import create_access_token
+
+HEADER = "title,description,category,max_attendees,date,start_time,end_time\n"
+
+
+def csv_body(rows: int, chunk_rows: int = 5000):
+    # Yield the body in pieces so the server sees a real stream
+    yield HEADER.encode()
+    for start in range(0, rows, chunk_rows):
+        yield "".join(
+            f"Imported event {i},Generated for the import benchmark,Cat {i % 20},50,2031-{1 + i % 12:02d}-{1 + i % 28:02d},10:00,11:00\n"
+            for i in range(start, min(rows, start + chunk_rows))
+        ).encode()
+
+
+async def run(rows: int, headers):
+    async def body():
+        for piece in csv_body(rows):
+            yield piece
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        r = await client.post("/events/import", content=body(), headers=headers)
+        elapsed = time.perf_counter() - started
+    assert r.status_code == 200, r.text
+    return r.json(), elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    init_db()
+    admin = f"bench-admin-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=admin, user_name=admin, password_hash="x", access_level="admin"))
+        db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(admin)}", "Content-Type": "text/csv"}
+    report, elapsed = asyncio.run(run(rows, headers))
+    print(f"{report['inserted']} rows imported ({report['failed']} failed) in {elapsed:.2f}s: {report['inserted'] / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
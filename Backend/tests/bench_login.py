@@ -0,0 +1,76 @@
+"""Measure login throughput with different bcrypt pool sizes.
+
+Fires concurrent POST /users/login requests and reports logins per second,
+p99 latency and how many requests were shed with 503 for each pool size.
+bcrypt releases the GIL, so throughput should scale with workers up to the
+number of cores.
+
+Run with: python -m tests.bench_login [logins] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import httpx
+from sqlalchemy import insert
+
+from app.main import app
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from app.core import security
+
+PASSWORD = "bench-password"
+
+
+def seed_users(count: int):
+    password_hash = security.hash_password(PASSWORD)
+    names = [f"bench-{uuid.uuid4()}" for _ in range(count)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"id": n, "user_name": n, "password_hash": password_hash} for n in names])
+        db.commit()
+    return names
+
+
+async def run(names, logins: int, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    latencies, shed = [], 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i):
+            nonlocal shed
+            async with gate:
+                started = time.perf_counter()
+                r = await client.post("/users/login", json={"username": names[i % len(names)], "password": PASSWORD})
+                latencies.append(time.perf_counter() - started)
+                if r.status_code == 503:
+                    shed += 1
+                else:
+                    assert r.status_code == 200, r.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return (logins - shed) / elapsed, latencies[int(len(latencies) * 0.99) - 1] * 1000, shed
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    init_db()
+    names = seed_users(50)
+    cores = os.cpu_count() or 1
+    print(f"{logins} logins, {concurrency} concurrent, bcrypt rounds {security.BCRYPT_ROUNDS}, {cores} cores")
+    for workers in sorted({1, max(1, cores // 2), cores}):
+        security.configure_hashing(workers, max_pending=workers * 8)
+        rate, p99, shed = asyncio.run(run(names, logins, concurrency))
+        print(f" - {workers:3} workers  {rate:7.1f} logins/s  p99 {p99:8.1f} ms  shed {shed}")
+    security.configure_hashing(security.HASH_WORKERS, security.HASH_MAX_PENDING)
+
+
+if __name__ == "__main__":
+    main()
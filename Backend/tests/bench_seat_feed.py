@@ -0,0 +1,62 @@
+"""Cost of idle seat feed listeners and of fanning one flush out to them.
+
+Subscribes `listeners` consumers to the in-process hub (no HTTP), each waiting
+like an open /events/seats/stream connection, split between single-event,
+category and catch-all filters. Reports memory per listener and how long one
+flush of `changed` events takes to reach all of them.
+
+Run with: python -m tests.bench_seat_feed [listeners] [changed]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from app.core.seat_feed import SeatHub
+
+
+async def run(listeners: int, changed: int):
+    hub = SeatHub()
+    delivered = 0
+    done = asyncio.Event()
+
+    async def listen(sub):
+        nonlocal delivered
+        while True:
+            await sub.next()
+            delivered += 1
+            if delivered == listeners:
+                done.set()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = []
+    for i in range(listeners):
+        kind = i % 3
+        sub = hub.subscribe(event_ids=[f"e{i % changed}"]) if kind == 0 else \
+            hub.subscribe(categories=[f"c{i % 10}"]) if kind == 1 else hub.subscribe()
+        tasks.append(asyncio.create_task(listen(sub)))
+    await asyncio.sleep(0)
+    per_listener = (tracemalloc.get_traced_memory()[0] - before) / listeners
+    tracemalloc.stop()
+
+    seats = [{"id": f"e{i}", "category": f"c{i % 10}", "current_attendees": 1, "max_attendees": 10}
+             for i in range(changed)]
+    started = time.perf_counter()
+    hub.publish(seats)
+    await done.wait()
+    elapsed = time.perf_counter() - started
+    print(f"{listeners} idle listeners: {per_listener / 1024:.1f} KiB each")
+    print(f"flush of {changed} changed events delivered to all in {elapsed * 1000:.1f}ms")
+    for task in tasks:
+        task.cancel()
+
+
+def main():
+    listeners = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    changed = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    asyncio.run(run(listeners, changed))
+
+
+if __name__ == "__main__":
+    main()
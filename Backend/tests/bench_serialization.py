@@ -0,0 +1,79 @@
+"""Query + serialization cost of a large event list response, before and after.
+
+Builds a throwaway database with `rows` events and times one full listing
+through each path, median of several runs:
+
+- orm + jsonable_encoder: ORM entities, EventOut validation per row, FastAPI's
+  default encoder and json.dumps, as the list routes originally responded
+- orm + TypeAdapter: ORM entities validated and dumped by pydantic-core, the
+  previous cached-bytes path
+- columns + orjson: plain column tuples encoded with orjson (current)
+
+Run with: python -m tests.bench_serialization [rows] [runs]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def median_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    # Engines are created from the environment at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-ser-'), 'bench.db')}"
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from app.core.serialization import EVENT_COLUMNS, dump_events
+    from app.database.init_db import init_db
+    from app.database.session import engine, SessionLocal
+    from app.models.event import Event
+    from app.schemas.event import EventOut
+    from tests.load_testDB import generate
+
+    init_db()
+    with engine.begin() as conn:
+        generate(conn, users=0, events=rows, bookings=0)
+    adapter = TypeAdapter(list[EventOut])
+
+    def orm_rows():
+        with SessionLocal() as db:
+            return db.scalars(select(Event)).all()
+
+    def column_rows():
+        with SessionLocal() as db:
+            return db.execute(select(*EVENT_COLUMNS)).all()
+
+    entities, tuples = orm_rows(), column_rows()
+    paths = [
+        ("orm + jsonable_encoder", orm_rows,
+         lambda: json.dumps(jsonable_encoder([EventOut.model_validate(e) for e in entities])).encode()),
+        ("orm + TypeAdapter", orm_rows,
+         lambda: adapter.dump_json(adapter.validate_python(entities, from_attributes=True))),
+        ("columns + orjson", column_rows, lambda: dump_events(tuples)),
+    ]
+    print(f"{rows} events, median of {runs} runs")
+    baseline = None
+    for name, query, serialize in paths:
+        query_ms, serialize_ms = median_ms(query, runs), median_ms(serialize, runs)
+        total = query_ms + serialize_ms
+        baseline = baseline or total
+        print(f"{name:>24}: query {query_ms:7.1f}ms  serialize {serialize_ms:7.1f}ms  "
+              f"total {total:7.1f}ms  ({baseline / total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
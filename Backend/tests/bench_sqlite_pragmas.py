@@ -0,0 +1,94 @@
+"""Mixed read/write throughput of the SQLite engine under different PRAGMA sets.
+
+Each run builds a fresh database file, then worker threads issue 80% point
+reads and 20% single-row update transactions for a fixed time.
+
+Run with: python -m tests.bench_sqlite_pragmas [seconds] [threads]
+"""
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import replace
+from datetime import date, time as dtime
+from pathlib import Path
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import Settings
+from app.database.session import Base, make_engine
+from app.models.event import Event
+
+EVENTS = 2000
+WRITE_RATIO = 0.2
+
+PRAGMA_SETS = {
+    "sqlite defaults": dict(sqlite_journal_mode="DELETE", sqlite_synchronous="FULL", sqlite_mmap_size=0, sqlite_cache_size=-2000),
+    "WAL": dict(sqlite_journal_mode="WAL", sqlite_synchronous="FULL", sqlite_mmap_size=0, sqlite_cache_size=-2000),
+    "WAL + NORMAL": dict(sqlite_journal_mode="WAL", sqlite_synchronous="NORMAL", sqlite_mmap_size=0, sqlite_cache_size=-2000),
+    "WAL + NORMAL + mmap/cache": {},  # the shipped defaults
+}
+
+
+def run(config: Settings, seconds: float, threads: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", config)
+        Base.metadata.create_all(engine)
+        ids = [str(uuid.uuid4()) for _ in range(EVENTS)]
+        with engine.begin() as conn:
+            conn.execute(insert(Event), [
+                {"id": i, "title": "Bench", "max_attendees": 10**9, "current_attendees": 0,
+                 "date": date(2030, 1, 1), "start_time": dtime(10), "end_time": dtime(11)}
+                for i in ids
+            ])
+
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def worker():
+            reads = writes = locked = 0
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                event_id = rng.choice(ids)
+                try:
+                    if rng.random() < WRITE_RATIO:
+                        with engine.begin() as conn:
+                            conn.execute(update(Event).where(Event.id == event_id)
+                                         .values(current_attendees=Event.current_attendees + 1))
+                        writes += 1
+                    else:
+                        with engine.connect() as conn:
+                            conn.execute(select(Event.__table__).where(Event.id == event_id)).first()
+                        reads += 1
+                except OperationalError:
+                    locked += 1
+            with lock:
+                counts["reads"] += reads
+                counts["writes"] += writes
+                counts["locked"] += locked
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        engine.dispose()
+        return {k: v / seconds for k, v in counts.items()}
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{seconds:g}s per run, {threads} threads, {int(WRITE_RATIO * 100)}% writes")
+    for name, overrides in PRAGMA_SETS.items():
+        config = replace(Settings(), pool_size=threads, **overrides)
+        result = run(config, seconds, threads)
+        print(f" - {name:26} {result['reads']:8.0f} reads/s {result['writes']:7.0f} writes/s {result['locked']:5.0f} locked/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from contextlib import contextmanager
+from datetime import date, time
+from typing import List, Tuple
+from sqlalchemy import event as sa_event, func, insert, select
+
+from app.core.security import create_access_token
+from app.database.session import engine, async_engine, read_engine, async_read_engine, SessionLocal
+from app.models.event import Event
+from app.models.user import User, user_events
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements run on every application engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, async_engine.sync_engine, read_engine, async_read_engine.sync_engine)
+    for e in engines:
+        sa_event.listen(e, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for e in engines:
+            sa_event.remove(e, "before_cursor_execute", before_cursor_execute)
+
+
+def run_async(make_coro):
+    """asyncio.run for tests that drive the app concurrently.
+
+    Under contention the async engines' pools bind to the running loop, so
+    they are disposed before it closes and the next test starts clean.
+    """
+    async def main():
+        try:
+            return await make_coro()
+        finally:
+            for e in (async_engine, async_read_engine):
+                await e.dispose()
+
+    return asyncio.run(main())
+
+
+def auth_header(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+def create_users(count: int, password_hash: str = "x") -> List[str]:
+    """Insert `count` users directly, names equal to their ids."""
+    ids = [f"user-{uuid.uuid4()}" for _ in range(count)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"id": i, "user_name": i, "password_hash": password_hash} for i in ids])
+        db.commit()
+    return ids
+
+
+def create_event(max_attendees: int = 10, category: str = "Cat", day: date = date(2030, 1, 1),
+                 start: time = time(10), end: time = time(11), title: str = "Test event") -> str:
+    with SessionLocal() as db:
+        event = Event(title=title, category=category, max_attendees=max_attendees,
+                      date=day, start_time=start, end_time=end)
+        db.add(event)
+        db.commit()
+        return event.id
+
+
+def seat_counts(event_id: str) -> Tuple[int, int]:
+    """(stored current_attendees, actual user_events rows) for an event."""
+    with SessionLocal() as db:
+        current = db.scalar(select(Event.current_attendees).where(Event.id == event_id))
+        linked = db.scalar(select(func.count()).select_from(user_events).where(user_events.c.event_id == event_id))
+    return current, linked
@@ -1,17 +1,42 @@
 """Utility script to populate the local SQLite test database (app.db) with sample users and events.
 
+Without arguments it loads a small hand-written sample. With sizes it
+generates a synthetic dataset instead: N users, M events and a bookings graph
+where event popularity follows a Zipf distribution, so a few events sell out
+and most stay quiet, like a real catalog.
+
 Run with: python -m tests.load_testDB
+      or: python -m tests.load_testDB --users 100000 --events 20000 --bookings 1000000 [--zipf 1.1] [--seed 0]
+
+Generated users are named gen-user-<n> (ids too) and all have the password
+GENERATED_PASSWORD; events have ids gen-event-<n>. Generated data is added to
+what is already there unless --reset is given.
 """
+import argparse
+import itertools
+import random
+import time as clock
 from datetime import date, time, timedelta
+from typing import Dict, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import Connection, insert, text
 
-from app.database.session import SessionLocal
+from app.database.attendees import paused_attendee_triggers
+from app.database.fts import deferred_fts_indexing
+from app.database.session import SessionLocal, engine
 from app.database.init_db import init_db
-from app.models.user import User
+from app.models.user import User, user_events
 from app.models.event import Event
 from app.core.security import hash_password
 
+GENERATED_PASSWORD = "password"
+INSERT_CHUNK = 50000
+CATEGORIES = [f"Cat {i}" for i in range(1, 21)]
+CAPACITIES = [20, 50, 100, 250, 1000]
+TOPICS = ["Yoga", "Tech", "Cooking", "Jazz", "Startup", "Chess", "Poetry", "Robotics", "Wine", "Running",
+          "Photography", "History", "Salsa", "Gardening", "Comedy", "Film", "Design", "Climbing", "Data", "Pottery"]
+KINDS = ["Talk", "Workshop", "Meetup", "Class", "Night", "Festival", "Tour", "Session"]
+
 
 def reset_db(session: Session):
     # Danger: deletes all data
@@ -80,23 +105,114 @@ def link_users_events(session: Session, users, events):
         session.commit()
 
 
-def update_event_attendee_counts(session: Session, events):
-    """Update current_attendees count for each event based on actual user relationships"""
-    for event in events:
-        event.current_attendees = len(event.users)
-    session.commit()
+def _insert_chunks(conn: Connection, table, rows: List[tuple]) -> None:
+    """executemany straight on the driver, rows are tuples in table column order.
 
+    Values go through the dialect's bind processors (dates, times) first, which
+    is what Core would do, minus its per-row overhead.
+    """
+    processors = [
+        (position, process)
+        for position, column in enumerate(table.columns)
+        if (process := column.type.dialect_impl(conn.dialect).bind_processor(conn.dialect))
+    ]
+    if processors:
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for position, process in processors:
+                row[position] = process(row[position])
+    sql = str(insert(table).compile(dialect=conn.dialect))
+    # Building an index once from sorted data beats updating it row by row
+    for index in table.indexes:
+        index.drop(conn)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        conn.exec_driver_sql(sql, [tuple(row) for row in rows[start:start + INSERT_CHUNK]])
+    for index in table.indexes:
+        index.create(conn)
+
+
+def zipf_bookings(rng: random.Random, users: int, capacities: List[int], bookings: int, s: float) -> List[Tuple[int, int]]:
+    """(user, event) index pairs, event popularity Zipf(s) over a shuffled ranking.
+
+    Repeat bookings and bookings of sold-out events are redrawn from the events
+    that still have seats, so fewer than `bookings` pairs only come back when
+    (nearly) everything is full.
+    """
+    ranking = list(range(len(capacities)))
+    rng.shuffle(ranking)
+    weights = [1 / (rank + 1) ** s for rank in range(len(ranking))]
+    taken = [0] * len(capacities)
+    pairs = set()
+    for _ in range(10):
+        missing = bookings - len(pairs)
+        open_ranks = [rank for rank, event in enumerate(ranking) if taken[event] < capacities[event]]
+        if missing <= 0 or not open_ranks:
+            break
+        cum_weights = list(itertools.accumulate(weights[rank] for rank in open_ranks))
+        for rank in rng.choices(open_ranks, cum_weights=cum_weights, k=missing):
+            event = ranking[rank]
+            pair = (int(rng.random() * users), event)
+            if taken[event] < capacities[event] and pair not in pairs:
+                pairs.add(pair)
+                taken[event] += 1
+    return list(pairs)
+
+
+def generate(conn: Connection, users: int, events: int, bookings: int, zipf: float = 1.1, seed: int = 0,
+             prefix: str = "gen") -> Dict[str, int]:
+    """Bulk insert a synthetic dataset with driver executemany, no ORM objects.
+
+    Ids are <prefix>-user-<n> and <prefix>-event-<n>, user names equal the ids.
+    """
+    rng = random.Random(seed)
+    # One bcrypt hash for everyone, hashing per user would take hours at scale
+    password_hash = hash_password(GENERATED_PASSWORD)
+    today = date.today()
 
-def main():
-    init_db()
+    capacities = [rng.choice(CAPACITIES) for _ in range(events)]
+    pairs = zipf_bookings(rng, users, capacities, bookings, zipf) if users and events else []
+    attendees = [0] * events
+    for _, event in pairs:
+        attendees[event] += 1
+
+    # Tuples in table column order, see _insert_chunks
+    event_rows = []
+    for i in range(events):
+        start = rng.randint(7, 21)
+        topic, kind = rng.choice(TOPICS), rng.choice(KINDS)
+        event_rows.append((
+            f"{prefix}-event-{i}",
+            f"{topic} {kind} #{i}",
+            f"A {kind.lower()} about {topic.lower()} for all levels.",
+            rng.choice(CATEGORIES),
+            capacities[i],
+            attendees[i],
+            today + timedelta(days=rng.randint(0, 365)),
+            time(start, rng.choice((0, 15, 30, 45))),
+            time(min(start + rng.randint(1, 2), 23), 45),
+        ))
+    # Inserting in key order keeps the B-tree writes sequential, several times
+    # faster than random order once the indexes outgrow the page cache
+    user_rows = sorted((f"{prefix}-user-{i}", password_hash, f"{prefix}-user-{i}", "user") for i in range(users))
+    booking_rows = sorted((f"{prefix}-user-{u}", f"{prefix}-event-{e}") for u, e in pairs)
+
+    _insert_chunks(conn, User.__table__, user_rows)
+    with deferred_fts_indexing(conn):
+        _insert_chunks(conn, Event.__table__, event_rows)
+    # current_attendees was precomputed above, the per-row triggers would count twice
+    with paused_attendee_triggers(conn):
+        _insert_chunks(conn, user_events, booking_rows)
+    return {"users": users, "events": events, "bookings": len(pairs)}
+
+
+def load_sample():
     db: Session = SessionLocal()
     try:
         reset_db(db)
         users = seed_users(db)
         events = seed_events(db)
+        # current_attendees follows the links through the user_events triggers
         link_users_events(db, users, events)
-        # Update current_attendees count based on actual relationships
-        update_event_attendee_counts(db, events)
         print("Seed completed. Users:")
         for u in users:
             print(f" - {u.id} ({u.user_name}): events: {[e.title for e in u.events]}")
@@ -107,5 +223,31 @@ def main():
         db.close()
 
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=0)
+    parser.add_argument("--events", type=int, default=0)
+    parser.add_argument("--bookings", type=int, default=0)
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew, higher means fewer hot events")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="delete all data first")
+    args = parser.parse_args()
+
+    init_db()
+    if not (args.users or args.events):
+        load_sample()
+        return
+    if args.reset:
+        with SessionLocal() as db:
+            reset_db(db)
+    started = clock.perf_counter()
+    with engine.begin() as conn:
+        counts = generate(conn, args.users, args.events, args.bookings, args.zipf, args.seed)
+    elapsed = clock.perf_counter() - started
+    rows = sum(counts.values())
+    print(f"Generated {counts['users']} users, {counts['events']} events and {counts['bookings']} bookings "
+          f"in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
 if __name__ == "__main__":
     main()
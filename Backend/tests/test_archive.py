@@ -0,0 +1,99 @@
+from datetime import date, time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from app.main import app
+from app.database import archive
+from app.database.archive import archive_past_events
+from app.database.attendees import TRIGGER_NAMES
+from app.database.init_db import init_db
+from app.database.session import SessionLocal, engine
+from app.models.archive import events_archive, user_events_archive
+from app.models.user import user_events
+from tests.helpers import auth_header, create_event, create_users
+
+init_db()
+client = TestClient(app)
+
+# Far enough back that no other test's events are older
+CUTOFF = date(1991, 1, 1)
+
+
+def _book(user_id, event_ids):
+    with SessionLocal() as db:
+        db.execute(insert(user_events), [{"user_id": user_id, "event_id": e} for e in event_ids])
+        db.commit()
+
+
+def _archived(event_ids):
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(events_archive).where(events_archive.c.id.in_(event_ids)))
+
+
+def test_past_events_move_with_their_bookings():
+    user_id, other = create_users(2)
+    past = create_event(title="Vintage Rave", day=date(1990, 6, 1), start=time(20), end=time(23))
+    future = create_event(day=date(2034, 1, 1))
+    _book(user_id, [past, future])
+    _book(other, [past])
+
+    assert archive_past_events(engine, CUTOFF) >= 1
+
+    with SessionLocal() as db:
+        assert db.scalar(select(events_archive.c.current_attendees).where(events_archive.c.id == past)) == 2
+        assert db.scalar(select(func.count()).select_from(user_events_archive)
+                         .where(user_events_archive.c.event_id == past)) == 2
+        assert db.scalar(select(func.count()).select_from(user_events).where(user_events.c.event_id == past)) == 0
+
+    # Live reads only see the hot set
+    assert client.get(f"/events/get_by_id/{past}").status_code == 404
+    r = client.get(f"/events/get_by_id/{past}", params={"includeArchived": "true"})
+    assert r.status_code == 200, r.text
+    assert r.json()["title"] == "Vintage Rave" and r.json()["current_attendees"] == 2
+    assert client.get(f"/events/get_by_id/{future}", params={"includeArchived": "true"}).json()["id"] == future
+    assert client.get("/events/search", params={"q": "vintage rave", "from": "1990-01-01"}).json() == []
+
+    url, headers = f"/users/{user_id}/getUserEvents", auth_header(user_id)
+    assert [e["id"] for e in client.get(url, headers=headers).json()] == [future]
+    r = client.get(url, params={"includeArchived": "true"}, headers=headers)
+    assert [e["id"] for e in r.json()] == [past, future]
+    r = client.get(url, params={"includeArchived": "true", "limit": 1}, headers=headers)
+    assert [e["id"] for e in r.json()] == [past]
+    r = client.get(url, params={"includeArchived": "true", "limit": 1, "cursor": r.headers["X-Next-Cursor"]},
+                   headers=headers)
+    assert [e["id"] for e in r.json()] == [future]
+    r = client.get(url, params={"includeArchived": "true", "to": "2000-01-01"}, headers=headers)
+    assert [e["id"] for e in r.json()] == [past]
+
+
+def test_archival_is_batched_and_resumable():
+    events = [create_event(day=date(1989, 1, day)) for day in range(1, 6)]
+
+    # An interrupted run leaves the rest for the next one
+    assert archive_past_events(engine, CUTOFF, batch_size=2, max_batches=1) == 2
+    assert _archived(events) == 2
+    archive_past_events(engine, CUTOFF, batch_size=2)
+    assert _archived(events) == 5
+    assert archive_past_events(engine, CUTOFF) == 0
+
+
+def test_failed_batch_is_rolled_back(monkeypatch):
+    (user_id,) = create_users(1)
+    event_id = create_event(day=date(1988, 3, 3))
+    _book(user_id, [event_id])
+
+    monkeypatch.setattr(archive, "_DELETE_EVENTS_SQL", "DELETE FROM no_such_table")
+    with pytest.raises(OperationalError):
+        archive_past_events(engine, CUTOFF)
+    assert _archived([event_id]) == 0
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(user_events).where(user_events.c.event_id == event_id)) == 1
+        # The attendee triggers paused by the batch came back with the rollback
+        triggers = db.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars().all()
+    assert set(TRIGGER_NAMES) <= set(triggers)
+    monkeypatch.undo()
+    assert archive_past_events(engine, CUTOFF) >= 1
+    assert _archived([event_id]) == 1
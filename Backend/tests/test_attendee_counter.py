@@ -0,0 +1,127 @@
+import uuid
+
+import pytest
+from datetime import date, time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, select, update
+
+from app.main import app
+from app.core.security import create_access_token
+from app.database.attendees import TRIGGER_NAMES, paused_attendee_triggers, reconcile_attendee_counts
+from app.database.init_db import init_db
+from app.database.session import SessionLocal, engine
+from app.models.event import Event
+from app.models.user import User, user_events
+
+init_db()
+client = TestClient(app)
+
+
+def _make_users(n: int):
+    ids = [f"user-{uuid.uuid4()}" for _ in range(n)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"id": i, "user_name": i, "password_hash": "x"} for i in ids])
+        db.commit()
+    return ids
+
+
+def _make_events(n: int, capacity: int = 10):
+    ids = [f"count-{uuid.uuid4()}" for _ in range(n)]
+    with SessionLocal() as db:
+        db.execute(insert(Event), [
+            {"id": i, "title": "Counted", "max_attendees": capacity, "current_attendees": 0,
+             "date": date(2031, 1, 1), "start_time": time(10), "end_time": time(11)}
+            for i in ids
+        ])
+        db.commit()
+    return ids
+
+
+def _counts(event_ids):
+    with SessionLocal() as db:
+        return dict(db.execute(select(Event.id, Event.current_attendees).where(Event.id.in_(event_ids))).all())
+
+
+def test_counter_follows_every_write_to_user_events():
+    users = _make_users(3)
+    a, b = _make_events(2)
+    with SessionLocal() as db:
+        # Raw Core writes, no booking code involved
+        db.execute(insert(user_events), [{"user_id": u, "event_id": a} for u in users])
+        db.commit()
+        assert _counts([a, b]) == {a: 3, b: 0}
+
+        db.execute(update(user_events).where(user_events.c.user_id == users[0]).values(event_id=b))
+        db.execute(delete(user_events).where(user_events.c.user_id == users[1]))
+        db.commit()
+    assert _counts([a, b]) == {a: 1, b: 1}
+
+    # And through the ORM relationship
+    with SessionLocal() as db:
+        user = db.get(User, users[2])
+        user.events.clear()
+        db.commit()
+    assert _counts([a, b]) == {a: 0, b: 1}
+
+
+def test_booking_api_keeps_counter_and_capacity():
+    users = _make_users(3)
+    (event_id,) = _make_events(1, capacity=2)
+    for user_id, expected in zip(users, (200, 200, 409)):
+        r = client.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": [event_id]},
+                       headers={"Authorization": f"Bearer {create_access_token(user_id)}"})
+        assert r.status_code == expected, r.text
+    assert _counts([event_id]) == {event_id: 2}
+
+    r = client.put(f"/users/{users[0]}/updateUserEvents", json={"removeEventIds": [event_id]},
+                   headers={"Authorization": f"Bearer {create_access_token(users[0])}"})
+    assert r.status_code == 200, r.text
+    assert _counts([event_id]) == {event_id: 1}
+
+
+def test_create_event_ignores_client_supplied_count():
+    (user_id,) = _make_users(1)
+    r = client.post("/events/", headers={"Authorization": f"Bearer {create_access_token(user_id)}"}, json={
+        "title": "Fresh", "max_attendees": 5, "current_attendees": 4,
+        "date": "2031-01-01", "start_time": "10:00:00", "end_time": "11:00:00",
+    })
+    assert r.status_code == 201, r.text
+    assert r.json()["current_attendees"] == 0
+
+
+def test_reconcile_finds_and_fixes_drift_in_chunks():
+    users = _make_users(2)
+    events = _make_events(5)
+    with SessionLocal() as db:
+        db.execute(insert(user_events), [{"user_id": u, "event_id": e} for u in users for e in events[:3]])
+        # Corrupt a few counters behind the triggers' back
+        db.execute(update(Event).where(Event.id.in_(events[:2])).values(current_attendees=7))
+        db.execute(update(Event).where(Event.id == events[4]).values(current_attendees=1))
+        db.commit()
+
+    drifted = {e: (stored, actual) for e, stored, actual in reconcile_attendee_counts(engine, chunk_size=2, dry_run=True)}
+    assert {e: drifted[e] for e in events if e in drifted} == {
+        events[0]: (7, 2), events[1]: (7, 2), events[4]: (1, 0),
+    }
+    assert _counts(events)[events[0]] == 7
+
+    reconcile_attendee_counts(engine, chunk_size=2)
+    assert _counts(events) == {events[0]: 2, events[1]: 2, events[2]: 2, events[3]: 0, events[4]: 0}
+    assert not reconcile_attendee_counts(engine, dry_run=True)
+
+
+def _trigger_names(conn):
+    return set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'").scalars())
+
+
+def test_paused_triggers_are_private_to_the_transaction_and_restored_on_error():
+    with pytest.raises(RuntimeError):
+        with engine.connect() as conn, paused_attendee_triggers(conn):
+            assert not set(TRIGGER_NAMES) & _trigger_names(conn)
+            # Other connections keep counting while the block runs
+            with engine.connect() as other:
+                assert set(TRIGGER_NAMES) <= _trigger_names(other)
+            raise RuntimeError("bulk load failed")
+    with engine.connect() as conn:
+        assert set(TRIGGER_NAMES) <= _trigger_names(conn)
@@ -0,0 +1,93 @@
+import uuid
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import insert, select
+
+from app.main import app
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from app.core import security
+from app.core.auth import principal_cache
+from tests.helpers import count_queries
+
+init_db()
+client = TestClient(app)
+
+
+def test_signup_then_login():
+    username = f"user-{uuid.uuid4()}"
+    r = client.post("/users/signup", json={"username": username, "password": "pw"})
+    assert r.status_code == 201, r.text
+    assert r.json()["accessLevel"] == "user"
+
+    r = client.post("/users/login", json={"username": username, "password": "pw"})
+    assert r.status_code == 200, r.text
+    r = client.post("/users/login", json={"username": username, "password": "wrong"})
+    assert r.status_code == 401
+
+
+def test_login_rehashes_outdated_cost_factor():
+    username = f"user-{uuid.uuid4()}"
+    cheap = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("pw")
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=username, user_name=username, password_hash=cheap))
+        db.commit()
+
+    r = client.post("/users/login", json={"username": username, "password": "pw"})
+    assert r.status_code == 200, r.text
+    with SessionLocal() as db:
+        stored = db.scalar(select(User.password_hash).where(User.id == username))
+    assert stored != cheap
+    assert security.pwd_context.identify(stored) == "bcrypt"
+    assert f"${security.BCRYPT_ROUNDS:02d}$" in stored
+
+
+def test_saturated_hash_pool_returns_503():
+    security.configure_hashing(workers=1, max_pending=0)
+    try:
+        r = client.post("/users/signup", json={"username": f"user-{uuid.uuid4()}", "password": "pw"})
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "1"
+    finally:
+        security.configure_hashing(security.HASH_WORKERS, security.HASH_MAX_PENDING)
+
+
+def _seed_user():
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    return user_id, {"Authorization": f"Bearer {security.create_access_token(user_id)}"}
+
+
+def test_repeat_requests_skip_token_decode_and_user_query():
+    user_id, headers = _seed_user()
+    with count_queries() as first:
+        assert client.get(f"/users/{user_id}", headers=headers).status_code == 200
+    with count_queries() as repeat:
+        assert client.get(f"/users/{user_id}", headers=headers).status_code == 200
+    # Only the handler's own queries remain once the principal is cached
+    assert len(repeat) == len(first) - 1, repeat
+    assert principal_cache.get(headers["Authorization"].split(" ", 1)[1]).id == user_id
+
+
+def test_access_level_change_invalidates_principal():
+    user_id, headers = _seed_user()
+    token = headers["Authorization"].split(" ", 1)[1]
+    assert client.get(f"/users/{user_id}", headers=headers).status_code == 200
+    assert principal_cache.get(token).access_level == "user"
+
+    with SessionLocal() as db:
+        db.get(User, user_id).access_level = "admin"
+        db.commit()
+    assert principal_cache.get(token) is None
+
+    assert client.get(f"/users/{user_id}", headers=headers).status_code == 200
+    assert principal_cache.get(token).access_level == "admin"
+
+
+def test_invalid_and_missing_tokens_rejected():
+    user_id, _ = _seed_user()
+    assert client.get(f"/users/{user_id}").status_code == 401
+    assert client.get(f"/users/{user_id}", headers={"Authorization": "Bearer junk"}).status_code == 401
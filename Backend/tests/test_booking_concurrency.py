@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database.init_db import init_db
+from tests.helpers import auth_header, create_event, create_users, run_async, seat_counts
+
+init_db()
+client = TestClient(app)
+
+
+def test_sold_out_returns_409():
+    first, second = create_users(2)
+    event_id = create_event(max_attendees=1)
+
+    r1 = client.put(f"/users/{first}/updateUserEvents", json={"addEventIds": [event_id]}, headers=auth_header(first))
+    assert r1.status_code == 200, r1.text
+    r2 = client.put(f"/users/{second}/updateUserEvents", json={"addEventIds": [event_id]}, headers=auth_header(second))
+    assert r2.status_code == 409, r2.text
+    assert "sold out" in r2.json()["detail"]
+    assert seat_counts(event_id) == (1, 1)
+
+
+def test_rebooking_does_not_double_count():
+    (user_id,) = create_users(1)
+    event_id = create_event(max_attendees=5)
+    headers = auth_header(user_id)
+
+    for _ in range(3):
+        r = client.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": [event_id, event_id]}, headers=headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["eventIds"] == [event_id]
+    assert seat_counts(event_id) == (1, 1)
+
+    r = client.put(f"/users/{user_id}/updateUserEvents", json={"removeEventIds": [event_id]}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert seat_counts(event_id) == (0, 0)
+
+
+def test_concurrent_bookings_never_oversell():
+    requests_total = 2000
+    seats = 500
+    user_ids = create_users(requests_total)
+    event_id = create_event(max_attendees=seats)
+
+    async def fire():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            calls = [
+                ac.put(f"/users/{u}/updateUserEvents", json={"addEventIds": [event_id]}, headers=auth_header(u))
+                for u in user_ids
+            ]
+            return await asyncio.gather(*calls)
+
+    started = time.perf_counter()
+    responses = run_async(fire)
+    elapsed = time.perf_counter() - started
+
+    statuses = [r.status_code for r in responses]
+    assert statuses.count(200) == seats
+    assert statuses.count(409) == requests_total - seats
+    assert seat_counts(event_id) == (seats, seats)
+
+    rps = requests_total / elapsed
+    print(f"\n{requests_total} concurrent bookings in {elapsed:.2f}s ({rps:.0f} req/s)")
+    assert rps > 50
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.core import booking_queue as queue_module
+from app.core.booking import BookingUpdate
+from app.core.booking_queue import apply_batch
+from app.core.config import settings
+from app.database.init_db import init_db
+from tests.helpers import auth_header, create_event, create_users, run_async, seat_counts
+
+init_db()
+
+
+def test_sold_out_update_is_rolled_back_alone():
+    first, second, third = create_users(3)
+    open_event = create_event(max_attendees=10)
+    full_event = create_event(max_attendees=1)
+
+    results = apply_batch([
+        BookingUpdate(first, add=[full_event]),
+        # Claims a seat on open_event, then fails on full_event: both must roll back
+        BookingUpdate(second, add=[open_event, full_event]),
+        BookingUpdate(third, add=[open_event]),
+    ])
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[1].sold_out == [full_event]
+    assert results[2].event_ids == [open_event]
+    assert seat_counts(open_event) == (1, 1)
+    assert seat_counts(full_event) == (1, 1)
+
+
+def test_queued_bookings_are_batched_and_never_oversell(monkeypatch):
+    requests_total = 400
+    seats = 100
+    user_ids = create_users(requests_total)
+    event_id = create_event(max_attendees=seats)
+
+    batch_sizes = []
+
+    def recording_apply_batch(changes):
+        batch_sizes.append(len(changes))
+        return apply_batch(changes)
+
+    monkeypatch.setattr(settings, "booking_queue", True)
+    monkeypatch.setattr(queue_module, "apply_batch", recording_apply_batch)
+
+    async def fire():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*[
+                ac.put(f"/users/{u}/updateUserEvents", json={"addEventIds": [event_id]}, headers=auth_header(u))
+                for u in user_ids
+            ])
+
+    responses = run_async(fire)
+
+    statuses = [r.status_code for r in responses]
+    assert statuses.count(200) == seats
+    assert statuses.count(409) == requests_total - seats
+    assert seat_counts(event_id) == (seats, seats)
+    assert sum(batch_sizes) == requests_total
+    assert len(batch_sizes) < requests_total
+
+
+def test_queued_unknown_event_returns_404(monkeypatch):
+    (user_id,) = create_users(1)
+    monkeypatch.setattr(settings, "booking_queue", True)
+
+    async def put():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await ac.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": ["nope"]},
+                                headers=auth_header(user_id))
+
+    r = run_async(put)
+    assert r.status_code == 404
+    assert "nope" in r.json()["detail"]
@@ -0,0 +1,54 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.main import app
+from app.database.fts import join_fts
+from app.database.init_db import init_db
+from app.database.session import engine
+from app.models.event import Event
+from app.models.user import User, user_events
+from tests.load_testDB import GENERATED_PASSWORD, generate
+
+init_db()
+client = TestClient(app)
+
+
+def test_generated_bookings_respect_capacity_and_counters():
+    prefix = f"t{uuid.uuid4().hex[:8]}"
+    with engine.begin() as conn:
+        counts = generate(conn, users=300, events=40, bookings=2000, seed=1, prefix=prefix)
+
+    with engine.connect() as conn:
+        users = conn.scalar(select(func.count()).select_from(User).where(User.id.like(f"{prefix}-%")))
+        linked = dict(conn.execute(
+            select(user_events.c.event_id, func.count())
+            .where(user_events.c.event_id.like(f"{prefix}-%"))
+            .group_by(user_events.c.event_id)
+        ).all())
+        events = conn.execute(
+            select(Event.id, Event.current_attendees, Event.max_attendees).where(Event.id.like(f"{prefix}-%"))
+        ).all()
+
+    assert users == 300
+    assert len(events) == 40
+    assert sum(linked.values()) == counts["bookings"]
+    for event_id, current, capacity in events:
+        assert current == linked.get(event_id, 0)
+        assert current <= capacity
+    # Zipf popularity: the busiest event has far more bookings than a typical one
+    booked = sorted(linked.values())
+    assert booked[-1] > 3 * booked[len(booked) // 2]
+
+
+def test_generated_users_can_log_in_and_events_are_indexed():
+    prefix = f"t{uuid.uuid4().hex[:8]}"
+    with engine.begin() as conn:
+        generate(conn, users=2, events=3, bookings=0, prefix=prefix)
+
+    r = client.post("/users/login", json={"username": f"{prefix}-user-0", "password": GENERATED_PASSWORD})
+    assert r.status_code == 200, r.text
+    with engine.connect() as conn:
+        indexed = conn.scalar(join_fts(select(func.count()).select_from(Event.__table__)).where(Event.id.like(f"{prefix}-%")))
+    assert indexed == 3
@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import Settings
+from app.database.session import make_async_engine, make_engine
+from app.database.init_db import init_db
+from app.database.migrations import MIGRATIONS, current_version, run_migrations
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", Settings())
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -64 * 1024
+
+
+def test_settings_read_from_environment(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///./other.db")
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+    config = Settings()
+    assert config.database_url == "sqlite:///./other.db"
+    assert config.pool_size == 20
+    assert config.sqlite_pragmas()["synchronous"] == "FULL"
+
+
+def test_other_databases_are_refused():
+    with pytest.raises(ValueError, match="Only SQLite"):
+        make_engine("postgresql://app@localhost/app", Settings())
+    with pytest.raises(ValueError, match="Only SQLite"):
+        make_async_engine("postgresql+asyncpg://app@localhost/app", Settings())
+
+
+def test_read_only_engine_refuses_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'ro.db'}"
+    with make_engine(url, Settings()).begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with make_engine(url, Settings(), read_only=True).connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+
+
+BASELINE_SCHEMA = [
+    "CREATE TABLE users (id VARCHAR NOT NULL PRIMARY KEY, password_hash VARCHAR NOT NULL, "
+    "user_name VARCHAR NOT NULL, access_level VARCHAR NOT NULL, CONSTRAINT uq_users_user_name UNIQUE (user_name))",
+    "CREATE TABLE events (id VARCHAR NOT NULL PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR, "
+    "category VARCHAR, max_attendees INTEGER NOT NULL, current_attendees INTEGER NOT NULL, "
+    "date DATE NOT NULL, start_time TIME NOT NULL, end_time TIME NOT NULL)",
+    "CREATE TABLE user_events (user_id VARCHAR NOT NULL REFERENCES users (id), "
+    "event_id VARCHAR NOT NULL REFERENCES events (id), PRIMARY KEY (user_id, event_id))",
+]
+
+
+def _index_names(engine):
+    with engine.connect() as conn:
+        return set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+
+
+def test_existing_database_is_upgraded_in_place(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'old.db'}", Settings())
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            "INSERT INTO events VALUES ('e1', 'Morning Yoga', 'Relaxing', 'Cat 1', 10, 0, '2030-01-01', '07:00:00', '08:00:00')"
+        )
+
+    init_db(engine)
+    assert {"ix_events_category_date", "ix_events_date_start_time", "ix_user_events_event_id"} <= _index_names(engine)
+    with engine.connect() as conn:
+        assert current_version(conn) == MIGRATIONS[-1].version
+
+        # Rows that predate the full-text index are searchable after the upgrade
+        assert conn.exec_driver_sql("SELECT rowid FROM events_fts WHERE events_fts MATCH 'yog*'").all()
+
+    # Running again is a no-op
+    assert run_migrations(engine) == []
+
+
+def _search(conn, match):
+    return conn.exec_driver_sql(
+        "SELECT k.event_id FROM events_fts JOIN events_fts_keys k ON k.rowid = events_fts.rowid "
+        "WHERE events_fts MATCH ? ORDER BY k.event_id", (match,)
+    ).scalars().all()
+
+
+def _insert_event(conn, event_id, title):
+    conn.exec_driver_sql(
+        "INSERT INTO events (id, title, description, category, max_attendees, current_attendees, date, start_time, end_time) "
+        "VALUES (?, ?, NULL, 'Cat', 10, 0, '2030-01-01', '07:00:00.000000', '08:00:00.000000')", (event_id, title)
+    )
+
+
+def test_search_survives_vacuum_renumbering_rowids(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'vacuum.db'}", Settings())
+    init_db(engine)
+    with engine.begin() as conn:
+        for i, title in enumerate(["Yoga", "Chess", "Pottery", "Salsa"]):
+            _insert_event(conn, f"e{i}", title)
+        conn.exec_driver_sql("DELETE FROM events WHERE id IN ('e0', 'e1')")
+    with engine.connect() as conn:
+        # Leaves the surviving rows with rowids 1 and 2 on a table without an INTEGER PRIMARY KEY
+        conn.exec_driver_sql("VACUUM")
+    with engine.begin() as conn:
+        _insert_event(conn, "e4", "Climbing")
+        conn.exec_driver_sql("UPDATE events SET title = 'Tango' WHERE id = 'e3'")
+
+    with engine.connect() as conn:
+        assert _search(conn, "pottery") == ["e2"]
+        assert _search(conn, "climbing") == ["e4"]
+        assert _search(conn, "tango") == ["e3"]
+        assert _search(conn, "salsa OR yoga OR chess") == []
+
+
+def test_rowid_keyed_index_is_rebuilt_on_upgrade(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'rowid.db'}", Settings())
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+        # The index as migration 2 first created it
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE events_fts USING fts5(title, description, content='events', content_rowid='rowid')"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER events_fts_ai AFTER INSERT ON events BEGIN "
+            "INSERT INTO events_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); END"
+        )
+        conn.exec_driver_sql("CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, description VARCHAR NOT NULL)")
+        conn.exec_driver_sql("INSERT INTO schema_migrations VALUES (1, 'indexes'), (2, 'fts'), (3, 'counter')")
+        _insert_event(conn, "e1", "Morning Yoga")
+
+    assert run_migrations(engine) == [4, 5]
+    with engine.begin() as conn:
+        _insert_event(conn, "e2", "Evening Yoga")
+        assert _search(conn, "yog*") == ["e1", "e2"]
@@ -0,0 +1,125 @@
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from app.core.cache import CachedResponse, LRUCache, event_cache
+from app.core.security import create_access_token
+
+init_db()
+client = TestClient(app)
+
+
+def _entry(body: bytes) -> CachedResponse:
+    return CachedResponse(body, "etag", {})
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(ttl=60, max_entries=2, max_bytes=1024)
+    cache.set("a", _entry(b"a"), cache.generation)
+    cache.set("b", _entry(b"b"), cache.generation)
+    assert cache.get("a") is not None
+    cache.set("c", _entry(b"c"), cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_is_bounded_by_bytes():
+    cache = LRUCache(ttl=60, max_entries=100, max_bytes=10)
+    cache.set("a", _entry(b"x" * 6), cache.generation)
+    cache.set("b", _entry(b"x" * 6), cache.generation)
+    assert cache.stats()["bytes"] <= 10
+    assert cache.get("a") is None
+    cache.set("huge", _entry(b"x" * 11), cache.generation)
+    assert cache.get("huge") is None
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(ttl=-1, max_entries=10, max_bytes=1024)
+    cache.set("a", _entry(b"a"), cache.generation)
+    assert cache.get("a") is None
+
+
+def test_stale_generation_is_not_stored():
+    cache = LRUCache(ttl=60, max_entries=10, max_bytes=1024)
+    generation = cache.generation
+    cache.clear()
+    cache.set("a", _entry(b"a"), generation)
+    assert cache.get("a") is None
+
+
+def _create_event(headers, max_attendees=10):
+    r = client.post("/events/", json={
+        "title": "Cached Event",
+        "category": f"cat-{uuid.uuid4()}",
+        "max_attendees": max_attendees,
+        "date": "2030-01-01",
+        "start_time": "10:00:00",
+        "end_time": "11:00:00",
+    }, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def test_get_event_etag_and_invalidation_on_booking():
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    event = _create_event(headers)
+
+    first = client.get(f"/events/get_by_id/{event['id']}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    hits = event_cache.stats()["hits"]
+    again = client.get(f"/events/get_by_id/{event['id']}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert event_cache.stats()["hits"] == hits + 1
+
+    r = client.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": [event["id"]]}, headers=headers)
+    assert r.status_code == 200, r.text
+
+    changed = client.get(f"/events/get_by_id/{event['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["current_attendees"] == 1
+    assert changed.headers["ETag"] != etag
+
+
+def test_category_listing_invalidated_by_create_event():
+    user_id = f"user-{uuid.uuid4()}"
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    first = _create_event(headers)
+    category = first["category"]
+
+    listing = client.get(f"/events/get_by_category/{category}")
+    assert [e["id"] for e in listing.json()] == [first["id"]]
+
+    r = client.post("/events/", json={**{k: first[k] for k in ("title", "max_attendees", "date", "start_time", "end_time")}, "category": category}, headers=headers)
+    assert r.status_code == 201
+    listing = client.get(f"/events/get_by_category/{category}", headers={"If-None-Match": listing.headers["ETag"]})
+    assert listing.status_code == 200
+    assert len(listing.json()) == 2
+
+
+def test_create_event_keeps_other_category_listings_cached():
+    user_id = f"user-{uuid.uuid4()}"
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    other = _create_event(headers)["category"]
+    assert client.get(f"/events/get_by_category/{other}").status_code == 200
+    assert event_cache.get(f"category:{other}") is not None
+
+    _create_event(headers)
+    assert event_cache.get(f"category:{other}") is not None
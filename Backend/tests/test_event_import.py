@@ -0,0 +1,96 @@
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+
+from app.main import app
+from app.core.event_import import IMPORT_COLUMNS, _bind_row, _insert_chunk
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from app.core.security import create_access_token
+from app.schemas.event import EventCreate
+
+init_db()
+client = TestClient(app)
+
+
+def _headers(access_level: str, content_type: str):
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x", access_level=access_level))
+        db.commit()
+    return {"Authorization": f"Bearer {create_access_token(user_id)}", "Content-Type": content_type}
+
+
+def test_csv_import_reports_bad_rows_and_keeps_good_ones():
+    word = "imp" + uuid.uuid4().hex[:8]
+    body = "\n".join([
+        "title,description,category,max_attendees,date,start_time,end_time",
+        f"{word} one,,Cat 1,10,2032-01-01,10:00,11:00",
+        f"\"{word} two, with comma\",desc,Cat 1,20,2032-01-02,10:00,11:00",
+        f"{word} bad,desc,Cat 1,,2032-01-03,10:00,11:00",
+        f"{word} bad date,desc,Cat 1,5,not-a-date,10:00,11:00",
+        "too,few",
+        f"{word} three,desc,Cat 2,30,2032-01-04,09:00,10:00",
+    ])
+    r = client.post("/events/import", content=body, headers=_headers("admin", "text/csv"))
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["inserted"] == 3
+    assert report["failed"] == 3
+    assert [e["line"] for e in report["errors"]] == [4, 5, 6]
+    assert "max_attendees" in report["errors"][0]["errors"][0]
+
+    # Imported rows are visible to the catalog and the full-text index
+    found = client.get("/events/search", params={"q": word, "from": "2032-01-01"}).json()
+    assert sorted(e["title"] for e in found) == sorted([f"{word} one", f"{word} two, with comma", f"{word} three"])
+    assert all(e["current_attendees"] == 0 for e in found)
+
+
+def test_ndjson_import():
+    word = "imp" + uuid.uuid4().hex[:8]
+    lines = [
+        json.dumps({"title": f"{word} {i}", "category": "Cat", "max_attendees": 5, "current_attendees": 99,
+                    "date": "2032-02-01", "start_time": "10:00:00", "end_time": "11:00:00"})
+        for i in range(3)
+    ] + ["{not json", "[1, 2]"]
+    r = client.post("/events/import", content="\n".join(lines), headers=_headers("admin", "application/x-ndjson"))
+    assert r.status_code == 200, r.text
+    assert r.json()["inserted"] == 3
+    assert [e["line"] for e in r.json()["errors"]] == [4, 5]
+    found = client.get("/events/search", params={"q": word, "from": "2032-01-01"}).json()
+    assert len(found) == 3
+    assert all(e["current_attendees"] == 0 for e in found)
+
+
+def test_import_requires_admin_and_known_format():
+    r = client.post("/events/import", content="title\n", headers=_headers("user", "text/csv"))
+    assert r.status_code == 403
+    r = client.post("/events/import", content="x", headers=_headers("admin", "application/xml"))
+    assert r.status_code == 415
+
+
+def test_failed_chunk_keeps_the_search_trigger():
+    existing = client.post("/events/", headers=_headers("user", "application/json"), json={
+        "title": "Original", "category": "Cat 1", "max_attendees": 5,
+        "date": "2032-02-01", "start_time": "10:00:00", "end_time": "11:00:00",
+    }).json()["id"]
+    row = list(_bind_row(EventCreate(title="Clash", category="Cat 1", max_attendees=5, date="2032-02-01",
+                                     start_time="10:00:00", end_time="11:00:00")))
+    row[IMPORT_COLUMNS.index("id")] = existing
+    with pytest.raises(IntegrityError):
+        _insert_chunk([tuple(row)])
+
+    with SessionLocal() as db:
+        triggers = db.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars().all()
+    assert "events_fts_ai" in triggers
+    word = "after" + uuid.uuid4().hex[:8]
+    created = client.post("/events/", headers=_headers("user", "application/json"), json={
+        "title": f"{word} party", "category": "Cat 1", "max_attendees": 5,
+        "date": "2032-02-02", "start_time": "10:00:00", "end_time": "11:00:00",
+    }).json()["id"]
+    r = client.get("/events/search", params={"q": word, "from": "2032-01-01"})
+    assert [e["id"] for e in r.json()] == [created]
@@ -0,0 +1,198 @@
+import json
+import uuid
+from datetime import date, time as dtime
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from app.models.event import Event
+from app.schemas.event import EventOut
+from tests.helpers import auth_header, count_queries
+
+init_db()
+client = TestClient(app)
+
+
+def _seed_booked_events(category: str, count: int):
+    user_ids = [f"user-{uuid.uuid4()}" for _ in range(3)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"id": u, "user_name": u, "password_hash": "x"} for u in user_ids])
+        db.commit()
+    headers = auth_header(user_ids[0])
+    event_ids = []
+    for i in range(count):
+        r = client.post("/events/", json={
+            "title": f"Event {i}",
+            "category": category,
+            "max_attendees": 10,
+            "date": "2030-01-01",
+            "start_time": "10:00:00",
+            "end_time": "11:00:00",
+        }, headers=headers)
+        assert r.status_code == 201, r.text
+        event_ids.append(r.json()["id"])
+    for u in user_ids:
+        r = client.put(f"/users/{u}/updateUserEvents", json={"addEventIds": event_ids}, headers=auth_header(u))
+        assert r.status_code == 200, r.text
+    return event_ids
+
+
+def test_get_all_events_is_a_single_query():
+    _seed_booked_events(f"cat-{uuid.uuid4()}", 5)
+    with count_queries() as statements:
+        r = client.get("/events/getAllEvents")
+    assert r.status_code == 200, r.text
+    assert len(statements) == 1, statements
+
+
+def test_get_by_category_is_a_single_query():
+    category = f"cat-{uuid.uuid4()}"
+    event_ids = _seed_booked_events(category, 5)
+    with count_queries() as statements:
+        r = client.get(f"/events/get_by_category/{category}")
+    assert r.status_code == 200, r.text
+    assert len(statements) == 1, statements
+    data = r.json()
+    assert sorted(e["id"] for e in data) == sorted(event_ids)
+    assert all(e["current_attendees"] == 3 for e in data)
+
+
+def test_get_all_events_keyset_pagination_covers_catalog():
+    _seed_booked_events(f"cat-{uuid.uuid4()}", 7)
+    expected = [e["id"] for e in client.get("/events/getAllEvents").json()]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/events/getAllEvents", params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page) <= 3
+        seen.extend(e["id"] for e in page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+
+def test_get_all_events_invalid_cursor():
+    r = client.get("/events/getAllEvents", params={"limit": 3, "cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_get_all_events_ndjson_stream():
+    _seed_booked_events(f"cat-{uuid.uuid4()}", 2)
+    expected = [e["id"] for e in client.get("/events/getAllEvents").json()]
+    r = client.get("/events/getAllEvents", params={"stream": True})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in rows] == expected
+
+
+def _create(headers, category, day, start, max_attendees=10):
+    r = client.post("/events/", json={
+        "title": f"{category} {day} {start}",
+        "category": category,
+        "max_attendees": max_attendees,
+        "date": day,
+        "start_time": start,
+        "end_time": "23:00:00",
+    }, headers=headers)
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_search_filters_by_date_time_category_and_free_seats():
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    headers = auth_header(user_id)
+    category = f"cat-{uuid.uuid4()}"
+    early = _create(headers, category, "2031-03-01", "09:00:00")
+    late = _create(headers, category, "2031-03-01", "18:00:00")
+    full = _create(headers, category, "2031-03-02", "10:00:00", max_attendees=1)
+    _create(headers, category, "2031-04-01", "10:00:00")
+    r = client.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": [full]}, headers=headers)
+    assert r.status_code == 200, r.text
+
+    def search(**params):
+        r = client.get("/events/search", params={"category": category, "from": "2031-03-01", "to": "2031-03-07", **params})
+        assert r.status_code == 200, r.text
+        return [e["id"] for e in r.json()]
+
+    assert search() == [early, late, full]
+    assert search(startFrom="12:00:00") == [late]
+    assert search(startTo="12:00:00") == [early, full]
+    assert search(hasFreeSeats=True) == [early, late]
+
+    first = client.get("/events/search", params={"category": category, "from": "2031-03-01", "to": "2031-03-07", "limit": 2})
+    assert [e["id"] for e in first.json()] == [early, late]
+    assert search(limit=2, cursor=first.headers["X-Next-Cursor"]) == [full]
+
+
+def test_search_defaults_to_upcoming_events():
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    headers = auth_header(user_id)
+    category = f"cat-{uuid.uuid4()}"
+    _create(headers, category, "2001-01-01", "10:00:00")
+    upcoming = _create(headers, category, "2031-01-01", "10:00:00")
+    r = client.get("/events/search", params={"category": category})
+    assert [e["id"] for e in r.json()] == [upcoming]
+
+
+def test_full_text_search_ranks_prefix_matches():
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    headers = auth_header(user_id)
+    word = "zq" + uuid.uuid4().hex[:8]
+
+    def create(title, description):
+        r = client.post("/events/", json={
+            "title": title, "description": description, "category": "Cat",
+            "max_attendees": 10, "date": "2031-05-01", "start_time": "10:00:00", "end_time": "11:00:00",
+        }, headers=headers)
+        assert r.status_code == 201, r.text
+        return r.json()["id"]
+
+    in_description = create("Evening talk", f"all about {word}ology")
+    in_title = create(f"{word}ology workshop", "hands on")
+    create("Unrelated", "nothing to see")
+
+    r = client.get("/events/search", params={"q": word[:6], "from": "2031-01-01"})
+    assert r.status_code == 200, r.text
+    assert [e["id"] for e in r.json()] == [in_title, in_description]
+
+    page = client.get("/events/search", params={"q": word, "from": "2031-01-01", "limit": 1})
+    assert [e["id"] for e in page.json()] == [in_title]
+    rest = client.get("/events/search", params={"q": word, "from": "2031-01-01", "limit": 1, "cursor": page.headers["X-Next-Cursor"]})
+    assert [e["id"] for e in rest.json()] == [in_description]
+
+    # Operators typed by users are treated as plain words
+    r = client.get("/events/search", params={"q": f'"{word}" OR (', "from": "2031-01-01"})
+    assert r.status_code == 200, r.text
+    assert client.get("/events/search", params={"q": "  ", "from": "2031-01-01"}).json() == []
+
+
+def test_fast_serialization_matches_event_out():
+    category = f"cat-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        event = Event(title="Ünïcode \"quoted\"", description=None, category=category, max_attendees=3,
+                      date=date(2031, 5, 6), start_time=dtime(9, 30), end_time=dtime(10, 15, 0, 250))
+        db.add(event)
+        db.commit()
+        expected = EventOut.model_validate(event).model_dump_json().encode()
+
+    assert client.get(f"/events/get_by_id/{event.id}").content == expected
+    assert client.get(f"/events/get_by_category/{category}").content == b"[" + expected + b"]"
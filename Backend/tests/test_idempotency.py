@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.main import app
+from app.routers import users as users_router
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.event import Event
+from app.models.user import User
+from tests.helpers import auth_header, count_queries, create_event, create_users, run_async, seat_counts
+
+init_db()
+client = TestClient(app)
+
+RETRIES = 20
+
+
+def _event_payload(title: str) -> dict:
+    return {"title": title, "category": "Cat", "max_attendees": 10, "date": "2031-05-01",
+            "start_time": "10:00:00", "end_time": "11:00:00"}
+
+
+def _burst(method: str, url: str, headers: dict, json: dict, count: int = RETRIES):
+    async def fire():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.request(method, url, json=json, headers=headers) for _ in range(count)))
+    return run_async(fire)
+
+
+def test_concurrent_retries_create_one_event_and_cost_no_queries():
+    (user_id,) = create_users(1)
+    headers = auth_header(user_id)
+    # Warm the principal cache, then measure one plain create as the baseline
+    assert client.post("/events/", json=_event_payload("baseline"), headers=headers).status_code == 201
+    with count_queries() as baseline:
+        assert client.post("/events/", json=_event_payload("baseline"), headers=headers).status_code == 201
+
+    title = f"retried-{uuid.uuid4()}"
+    with count_queries() as statements:
+        responses = _burst("POST", "/events/", {**headers, "Idempotency-Key": str(uuid.uuid4())}, _event_payload(title))
+
+    assert [r.status_code for r in responses] == [201] * RETRIES
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == RETRIES - 1
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Event).where(Event.title == title)) == 1
+    # The duplicates never reached the handler or the database
+    assert len(statements) == len(baseline), statements
+
+
+def test_retried_booking_after_completion_is_replayed():
+    (user_id,) = create_users(1)
+    event_id = create_event(max_attendees=1)
+    headers = {**auth_header(user_id), "Idempotency-Key": str(uuid.uuid4())}
+    body = {"addEventIds": [event_id]}
+
+    first = client.put(f"/users/{user_id}/updateUserEvents", json=body, headers=headers)
+    with count_queries() as statements:
+        retry = client.put(f"/users/{user_id}/updateUserEvents", json=body, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert statements == []
+    assert seat_counts(event_id) == (1, 1)
+
+
+def test_concurrent_signup_retries_hash_once(monkeypatch):
+    hashed = []
+    original = users_router.hash_password_async
+
+    async def counting_hash(password):
+        hashed.append(password)
+        return await original(password)
+
+    monkeypatch.setattr(users_router, "hash_password_async", counting_hash)
+    username = f"retry-{uuid.uuid4()}"
+    responses = _burst("POST", "/users/signup", {"Idempotency-Key": str(uuid.uuid4())},
+                       {"username": username, "password": "secret123"}, count=5)
+
+    assert [r.status_code for r in responses] == [201] * 5
+    assert len({r.json()["userId"] for r in responses}) == 1
+    assert len(hashed) == 1
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(User).where(User.user_name == username)) == 1
+
+
+def test_key_reuse_with_another_body_is_rejected():
+    (user_id,) = create_users(1)
+    headers = {**auth_header(user_id), "Idempotency-Key": str(uuid.uuid4())}
+    assert client.post("/events/", json=_event_payload("first"), headers=headers).status_code == 201
+    r = client.post("/events/", json=_event_payload("second"), headers=headers)
+    assert r.status_code == 422
+    assert "Idempotency-Key" in r.json()["detail"]
+
+
+def test_keys_are_scoped_to_the_caller():
+    first, second = create_users(2)
+    key = str(uuid.uuid4())
+    payload = _event_payload(f"scoped-{uuid.uuid4()}")
+    a = client.post("/events/", json=payload, headers={**auth_header(first), "Idempotency-Key": key})
+    b = client.post("/events/", json=payload, headers={**auth_header(second), "Idempotency-Key": key})
+    assert a.json()["id"] != b.json()["id"]
+    assert "Idempotent-Replayed" not in b.headers
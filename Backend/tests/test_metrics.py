@@ -0,0 +1,127 @@
+import json
+import logging
+import re
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, text
+
+from app.main import app
+from app.core.log import JsonFormatter
+from app.core.booking import BookingUpdate
+from app.core.booking_queue import BookingQueue
+from app.core.metrics import RequestStats, current_request, instrument_engine, registry
+from app.core.seat_feed import SeatHub
+from app.core.security import create_access_token
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import User
+from tests.helpers import create_event, create_users, run_async
+
+init_db()
+client = TestClient(app)
+
+
+def _sample(body: str, name: str, **labels) -> float:
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(wanted)}\}} (\S+)$", body, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_report_route_latency_and_sql_per_request():
+    user_id = f"user-{uuid.uuid4()}"
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=user_id, user_name=user_id, password_hash="x"))
+        db.commit()
+    route = dict(method="POST", route="/events/")
+    before = client.get("/metrics").text
+
+    # Sync route: the statements run on a threadpool worker
+    r = client.post("/events/", headers={"Authorization": f"Bearer {create_access_token(user_id)}"}, json={
+        "title": "Metrics", "max_attendees": 5, "date": "2031-01-01", "start_time": "10:00:00", "end_time": "11:00:00",
+    })
+    assert r.status_code == 201, r.text
+    after = client.get("/metrics")
+
+    assert after.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = after.text
+    assert _sample(body, "http_requests_total", **route, status="201") == _sample(before, "http_requests_total", **route, status="201") + 1
+    assert _sample(body, "http_request_duration_seconds_count", **route) == _sample(before, "http_request_duration_seconds_count", **route) + 1
+    # Auth lookup on the async engine plus the insert on the sync one
+    queries = _sample(body, "http_request_db_queries_sum", **route) - _sample(before, "http_request_db_queries_sum", **route)
+    assert queries >= 2
+    assert _sample(body, "http_request_db_seconds_sum", **route) > _sample(before, "http_request_db_seconds_sum", **route)
+
+
+def test_unmatched_paths_share_one_series():
+    client.get(f"/no-such-page-{uuid.uuid4()}")
+    body = client.get("/metrics").text
+    assert _sample(body, "http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert "no-such-page" not in body
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_slow_queries_are_logged_and_counted():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "slow-test", slow_query_ms=50)
+    slow_log = logging.getLogger("app.db.slow")
+    handler = _Collect()
+    slow_log.addHandler(handler)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 300000) SELECT count(*) FROM n"
+            ))
+            conn.execute(text("SELECT 1"))
+    finally:
+        slow_log.removeHandler(handler)
+
+    records = handler.records
+    assert len(records) == 1
+    assert "RECURSIVE" in records[0].statement
+    assert records[0].duration_ms >= 50
+    assert _sample(registry.render(), "db_slow_queries_total", engine="slow-test") == 1
+
+
+def test_json_log_lines_carry_extra_fields():
+    record = logging.getLogger("app.test").makeRecord(
+        "app.test", logging.WARNING, __file__, 1, "slow query", (), None, extra={"duration_ms": 12.5}
+    )
+    line = json.loads(JsonFormatter().format(record))
+    assert line["level"] == "warning"
+    assert line["msg"] == "slow query"
+    assert line["duration_ms"] == 12.5
+
+
+def test_background_tasks_are_not_charged_to_the_request_that_started_them():
+    (user_id,) = create_users(1)
+    event_id = create_event()
+    stats = RequestStats()
+
+    async def scenario():
+        queue, hub = BookingQueue(), SeatHub(interval_ms=1)
+        token = current_request.set(stats)
+        try:
+            # Both lazily start their task from inside this "request"
+            sub = hub.subscribe(event_ids=[event_id])
+            await queue.submit(BookingUpdate(user_id, add=[event_id]))
+        finally:
+            current_request.reset(token)
+        queries = stats.queries
+        hub.touch([event_id])
+        assert await sub.next(timeout=5)
+        await queue.submit(BookingUpdate(user_id, remove=[event_id]))
+        return queries
+
+    queries = run_async(scenario)
+    # The writer's batch and the seat flush ran on their own context
+    assert queries == 0
+    assert stats.queries == 0
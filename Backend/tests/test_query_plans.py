@@ -0,0 +1,62 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.database.init_db import init_db
+from app.database.session import engine
+from app.models.event import Event
+from app.models.user import user_events
+from app.routers.events import CATALOG_ORDER
+
+init_db()
+
+
+def _plan(stmt) -> str:
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_category_listing_uses_category_date_index():
+    plan = _plan(select(Event).where(Event.category.in_(["Cat 1", "Cat 2"])).order_by(*CATALOG_ORDER))
+    assert "USING INDEX ix_events_category_date" in plan, plan
+    assert "SCAN events" not in plan, plan
+
+
+def test_date_range_uses_date_index():
+    stmt = select(Event).where(Event.date.between(date(2030, 1, 1), date(2030, 1, 7))).order_by(*CATALOG_ORDER)
+    plan = _plan(stmt)
+    assert "ix_events_date_start_time" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_catalog_keyset_order_needs_no_sort():
+    plan = _plan(select(Event).order_by(*CATALOG_ORDER).limit(50))
+    assert "ix_events_date_start_time" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_event_attendees_lookup_uses_event_id_index():
+    plan = _plan(select(user_events.c.user_id).where(user_events.c.event_id == "some-event"))
+    assert "ix_user_events_event_id" in plan, plan
+
+
+def test_search_with_category_and_date_range_uses_composite_index():
+    stmt = (
+        select(Event)
+        .where(Event.date >= date(2030, 1, 1), Event.date <= date(2030, 1, 7), Event.category.in_(["Cat 1"]))
+        .where(Event.current_attendees < Event.max_attendees)
+        .order_by(*CATALOG_ORDER)
+    )
+    plan = _plan(stmt)
+    assert "USING INDEX ix_events_category_date (category=? AND date>? AND date<?)" in plan, plan
+
+
+def test_itinerary_starts_from_the_users_bookings():
+    stmt = (
+        select(Event).join(user_events, user_events.c.event_id == Event.id)
+        .where(user_events.c.user_id == "some-user", Event.date >= date(2030, 1, 1)).order_by(*CATALOG_ORDER)
+    )
+    plan = _plan(stmt)
+    assert "SEARCH user_events USING" in plan and "(user_id=?)" in plan, plan
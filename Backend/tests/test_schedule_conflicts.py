@@ -0,0 +1,137 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.booking import BookingUpdate, commit_booking
+from app.core.schedule import ScheduleIndex, Slot, booking_conflicts, schedule_conflicts
+from app.database.init_db import init_db
+from tests.helpers import auth_header, create_event, create_users
+
+init_db()
+client = TestClient(app)
+
+DAY = date(2032, 3, 1)
+
+
+def _create_event(start: int, end: int, day: date = DAY) -> str:
+    return create_event(category="Schedule", day=day, start=time(start), end=time(end))
+
+
+def _book(user_id: str, add=(), remove=(), strict=None):
+    body = {"addEventIds": list(add), "removeEventIds": list(remove)}
+    if strict is not None:
+        body["strict"] = strict
+    return client.put(f"/users/{user_id}/updateUserEvents", json=body, headers=auth_header(user_id))
+
+
+def test_index_matches_pairwise_comparison():
+    rng = random.Random(7)
+    slots = []
+    for i in range(400):
+        start = rng.randrange(0, 23 * 60)
+        end = min(start + rng.randrange(15, 240), 23 * 60 + 59)
+        slots.append(Slot(f"e{i}", date(2032, 1, 1 + rng.randrange(3)),
+                          time(start // 60, start % 60), time(end // 60, end % 60)))
+    index = ScheduleIndex(slots)
+
+    def overlaps(a, b):
+        return a.date == b.date and a.start_time < b.end_time and b.start_time < a.end_time
+
+    for slot in slots:
+        expected = {o.event_id for o in slots if o is not slot and overlaps(slot, o)}
+        assert {o.event_id for o in index.overlapping(slot)} == expected
+    pairs = {frozenset((c.event_id, c.conflicting_event_id)) for c in schedule_conflicts(slots)}
+    assert pairs == {frozenset((a.event_id, b.event_id)) for i, a in enumerate(slots) for b in slots[i + 1:] if overlaps(a, b)}
+
+
+class _CountingList(list):
+    reads = 0
+
+    def __getitem__(self, key):
+        _CountingList.reads += 1
+        return super().__getitem__(key)
+
+
+def test_long_booking_does_not_make_lookups_linear():
+    # An all-day booking keeps the latest end high for every later start; the
+    # tree still only walks down to the bookings that actually overlap
+    slots = [Slot("all-day", DAY, time(0), time(23, 59))]
+    slots += [Slot(f"short-{i}", DAY, time(i % 22, i % 59), time(i % 22, i % 59 + 1)) for i in range(1000)]
+    index = ScheduleIndex(slots)
+    day = index._days[DAY]
+    day.tree = _CountingList(day.tree)
+
+    found = index.overlapping(Slot("late", DAY, time(22), time(22, 30)))
+    assert [slot.event_id for slot in found] == ["all-day"]
+    assert _CountingList.reads < 60, _CountingList.reads
+
+
+def test_back_to_back_events_do_not_conflict():
+    morning = Slot("a", DAY, time(9), time(10))
+    assert booking_conflicts([morning], [Slot("b", DAY, time(10), time(11))]) == []
+    assert booking_conflicts([morning], [Slot("c", date(2032, 3, 2), time(9), time(10))]) == []
+    assert [c.conflicting_event_id for c in booking_conflicts([morning], [Slot("d", DAY, time(9), time(11))])] == ["a"]
+
+
+def test_conflicts_are_reported_and_booked_by_default():
+    (user_id,) = create_users(1)
+    first, overlapping, later = _create_event(9, 11), _create_event(10, 12), _create_event(12, 13)
+    assert _book(user_id, add=[first]).json()["conflicts"] == []
+
+    r = _book(user_id, add=[overlapping, later])
+    assert r.status_code == 200, r.text
+    assert sorted(r.json()["eventIds"]) == sorted([first, overlapping, later])
+    assert r.json()["conflicts"] == [{"eventId": overlapping, "conflictingEventId": first, "date": DAY.isoformat()}]
+
+    r = client.get(f"/users/{user_id}/conflicts", headers=auth_header(user_id))
+    assert r.status_code == 200, r.text
+    assert r.json() == [{"eventId": first, "conflictingEventId": overlapping, "date": DAY.isoformat()}]
+
+
+def test_strict_mode_rejects_the_whole_update():
+    (user_id,) = create_users(1)
+    booked, free, clash = _create_event(14, 16), _create_event(8, 9), _create_event(15, 17)
+    _book(user_id, add=[booked])
+
+    r = _book(user_id, add=[free, clash], strict=True)
+    assert r.status_code == 409
+    assert f"{clash}/{booked}" in r.json()["detail"]
+    # Nothing of a rejected update is booked, not even the free event
+    r = client.get(f"/users/{user_id}", headers=auth_header(user_id))
+    assert r.json()["eventIds"] == [booked]
+
+    # Two new events that overlap each other also conflict
+    a, b = _create_event(18, 20), _create_event(19, 21)
+    assert _book(user_id, add=[a, b], strict=True).status_code == 409
+
+    # Dropping the clashing booking in the same update makes room
+    r = _book(user_id, add=[clash], remove=[booked], strict=True)
+    assert r.status_code == 200, r.text
+    assert r.json()["eventIds"] == [clash]
+    assert client.get(f"/users/{user_id}/conflicts", headers=auth_header(user_id)).json() == []
+
+
+def test_concurrent_strict_updates_cannot_both_book_a_clash():
+    for _ in range(5):
+        (user_id,) = create_users(1)
+        morning, overlapping = _create_event(9, 11), _create_event(10, 12)
+        barrier = threading.Barrier(2)
+
+        def book(event_id):
+            barrier.wait()
+            return commit_booking(BookingUpdate(user_id, [event_id], strict=True))
+
+        with ThreadPoolExecutor(2) as pool:
+            results = list(pool.map(book, [morning, overlapping]))
+        assert sorted(r.ok for r in results) == [False, True]
+        r = client.get(f"/users/{user_id}", headers=auth_header(user_id))
+        assert len(r.json()["eventIds"]) == 1
+
+
+def test_conflicts_are_private():
+    owner, other = create_users(2)
+    assert client.get(f"/users/{owner}/conflicts", headers=auth_header(other)).status_code == 403
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+
+from app.main import app
+from app.core.seat_feed import SeatHub, Subscription, seat_hub
+from app.database.init_db import init_db
+from tests.helpers import auth_header, create_event, create_users, run_async
+
+init_db()
+
+
+def _seat(event_id: str, current: int, category: str = "Cat") -> dict:
+    return {"id": event_id, "category": category, "current_attendees": current, "max_attendees": 10}
+
+
+def test_subscription_coalesces_and_resyncs_on_overflow():
+    async def scenario():
+        sub = Subscription(max_pending=2)
+        for current in range(5):
+            sub.offer([_seat("a", current)])
+        sub.offer([_seat("b", 1)])
+        # Five updates of "a" collapse into the latest one
+        assert await sub.next(timeout=0) == [_seat("a", 4), _seat("b", 1)]
+        assert await sub.next(timeout=0) is None
+
+        sub.offer([_seat(event_id, 1) for event_id in "abc"])
+        # A third distinct event overflows the buffer: updates are dropped for a resync
+        assert await sub.next(timeout=0) == []
+        assert sub.overflowed
+        # Nothing more is buffered until the client resynced
+        sub.offer([_seat("d", 2)])
+        assert await sub.next(timeout=0) is None
+        sub.resynced()
+        sub.offer([_seat("d", 3)])
+        assert await sub.next(timeout=0) == [_seat("d", 3)]
+        assert not sub.overflowed
+
+        # An empty flush wakes nobody
+        sub.offer([])
+        assert await sub.next(timeout=0) is None
+
+    asyncio.run(scenario())
+
+
+def test_hub_routes_by_event_and_category():
+    async def scenario():
+        hub = SeatHub()
+        by_event = hub.subscribe(event_ids=["a"])
+        by_category = hub.subscribe(categories=["Music"])
+        everything = hub.subscribe()
+        hub.publish([_seat("a", 1, "Sports"), _seat("b", 2, "Music"), _seat("c", 3, "Other")])
+
+        assert [s["id"] for s in await by_event.next(timeout=0)] == ["a"]
+        assert [s["id"] for s in await by_category.next(timeout=0)] == ["b"]
+        assert [s["id"] for s in await everything.next(timeout=0)] == ["a", "b", "c"]
+
+        for sub in (by_event, by_category, everything):
+            hub.unsubscribe(sub)
+            hub.unsubscribe(sub)
+        assert len(hub) == 0
+        assert not hub._by_event and not hub._by_category
+
+    asyncio.run(scenario())
+
+
+async def _read_sse(scope_query: str, messages: asyncio.Queue, disconnect: asyncio.Event):
+    """Drive the ASGI app directly so the endless body can be read as it streams."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/events/seats/stream", "raw_path": b"/events/seats/stream",
+        "query_string": scope_query.encode(), "headers": [], "client": ("test", 1), "server": ("test", 80),
+    }
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await messages.put(message)
+
+    await app(scope, receive, send)
+
+
+async def _next_sse_event(messages: asyncio.Queue) -> tuple:
+    while True:
+        message = await asyncio.wait_for(messages.get(), timeout=5)
+        body = message.get("body", b"")
+        if message["type"] == "http.response.body" and body.startswith(b"event:"):
+            name, data = body.decode().strip().split("\n")
+            return name[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_bookings_and_new_events_are_pushed_to_subscribers():
+    category = f"live-{uuid.uuid4()}"
+    watched = create_event(category=category)
+    users = create_users(3)
+
+    async def scenario():
+        messages, disconnect = asyncio.Queue(), asyncio.Event()
+        stream = asyncio.create_task(_read_sse(f"category={category}", messages, disconnect))
+        start = await asyncio.wait_for(messages.get(), timeout=5)
+        assert start["status"] == 200
+        assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+        assert (await asyncio.wait_for(messages.get(), timeout=5))["body"] == b": connected\n\n"
+        assert len(seat_hub) == 1
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Updates that change no booking are not published
+            r = await client.put(f"/users/{users[0]}/updateUserEvents", json={"removeEventIds": [watched, "no-such-event"]},
+                                 headers=auth_header(users[0]))
+            assert r.status_code == 200, r.text
+            # A burst of bookings reaches the subscriber as one coalesced count
+            for user_id in users:
+                r = await client.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": [watched]},
+                                     headers=auth_header(user_id))
+                assert r.status_code == 200, r.text
+            name, seats = await _next_sse_event(messages)
+            assert name == "seats"
+            assert seats == [{"id": watched, "category": category, "current_attendees": 3, "max_attendees": 10}]
+
+            r = await client.post("/events/", headers=auth_header(users[0]), json={
+                "title": "Late addition", "category": category, "max_attendees": 4,
+                "date": "2031-01-02", "start_time": "10:00:00", "end_time": "11:00:00",
+            })
+            assert r.status_code == 201, r.text
+            name, seats = await _next_sse_event(messages)
+            assert [(s["id"], s["current_attendees"]) for s in seats] == [(r.json()["id"], 0)]
+
+            # The no-op update above did not queue anything behind these
+            await asyncio.sleep(seat_hub.interval * 2)
+            assert messages.empty()
+
+        disconnect.set()
+        await asyncio.wait_for(stream, timeout=5)
+        assert len(seat_hub) == 0
+
+    run_async(scenario)
@@ -34,21 +34,21 @@ def test_add_and_remove_events():
         "title": "Test Event",
         "description": "Desc",
         "category": "Cat",
-        "maxAttendees": 100,
+        "max_attendees": 100,
         "date": "2030-01-01",
-        "startTime": "10:00:00",
-        "endTime": "11:00:00"
+        "start_time": "10:00:00",
+        "end_time": "11:00:00"
     }
     er = client.post("/events/", json=event_payload, headers=headers)
     assert er.status_code == 201, er.text
     event_id = er.json()["id"]
 
     # Add event to user
-    ur = client.put(f"/users/{user_id}/events", json={"addEventIds": [event_id]}, headers=headers)
+    ur = client.put(f"/users/{user_id}/updateUserEvents", json={"addEventIds": [event_id]}, headers=headers)
     assert ur.status_code == 200, ur.text
     assert event_id in ur.json()["eventIds"]
 
     # Remove event
-    ur2 = client.put(f"/users/{user_id}/events", json={"removeEventIds": [event_id]}, headers=headers)
+    ur2 = client.put(f"/users/{user_id}/updateUserEvents", json={"removeEventIds": [event_id]}, headers=headers)
     assert ur2.status_code == 200, ur2.text
     assert event_id not in ur2.json()["eventIds"]
@@ -0,0 +1,99 @@
+from datetime import date, time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.core.ical import ics_event
+from app.database.init_db import init_db
+from app.database.session import SessionLocal
+from app.models.user import user_events
+from tests.helpers import auth_header, count_queries, create_event, create_users
+
+init_db()
+client = TestClient(app)
+
+
+def _booked_user(*slots):
+    """A user booked on one event per (day, start hour), returns (user id, event ids)."""
+    (user_id,) = create_users(1)
+    event_ids = [create_event(day=day, start=time(hour), end=time(hour + 1)) for day, hour in slots]
+    with SessionLocal() as db:
+        db.execute(insert(user_events), [{"user_id": user_id, "event_id": e} for e in event_ids])
+        db.commit()
+    return user_id, event_ids
+
+
+def test_itinerary_is_date_ordered_filtered_and_paginated():
+    user_id, (late, early, middle, next_day) = _booked_user(
+        (date(2033, 5, 1), 18), (date(2033, 5, 1), 8), (date(2033, 5, 1), 12), (date(2033, 5, 2), 9),
+    )
+    headers = auth_header(user_id)
+    url = f"/users/{user_id}/getUserEvents"
+
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200, r.text
+    assert [e["id"] for e in r.json()] == [early, middle, late, next_day]
+    assert "X-Next-Cursor" not in r.headers
+
+    r = client.get(url, params={"from": "2033-05-02"}, headers=headers)
+    assert [e["id"] for e in r.json()] == [next_day]
+    r = client.get(url, params={"to": "2033-05-01"}, headers=headers)
+    assert [e["id"] for e in r.json()] == [early, middle, late]
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        r = client.get(url, params=params, headers=headers)
+        pages.append([e["id"] for e in r.json()])
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == [[early, middle, late], [next_day]]
+
+
+def test_itinerary_is_a_single_query():
+    user_id, _ = _booked_user((date(2033, 6, 1), 10))
+    headers = auth_header(user_id)
+    # The first request verifies the token, later ones hit the principal cache
+    client.get(f"/users/{user_id}/getUserEvents", headers=headers)
+    with count_queries() as statements:
+        r = client.get(f"/users/{user_id}/getUserEvents", headers=headers)
+    assert r.status_code == 200, r.text
+    assert len(statements) == 1, statements
+
+
+def test_itinerary_is_private():
+    owner, other = create_users(2)
+    assert client.get(f"/users/{owner}/getUserEvents", headers=auth_header(other)).status_code == 403
+    assert client.get(f"/users/{owner}/events.ics", headers=auth_header(other)).status_code == 403
+
+
+def test_ics_export_streams_the_bookings():
+    user_id, (first, second) = _booked_user((date(2033, 7, 2), 9), (date(2033, 7, 1), 14))
+    r = client.get(f"/users/{user_id}/events.ics", headers=auth_header(user_id))
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/calendar")
+    body = r.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert body.count("BEGIN:VEVENT") == 2
+    # Date ordered, as getUserEvents
+    assert body.index(f"UID:{second}@") < body.index(f"UID:{first}@")
+    assert "DTSTART:20330701T140000\r\n" in body
+    assert "DTEND:20330702T100000\r\n" in body
+
+    r = client.get(f"/users/{user_id}/events.ics", params={"from": "2033-07-02"}, headers=auth_header(user_id))
+    assert r.text.count("BEGIN:VEVENT") == 1 and f"UID:{first}@" in r.text
+
+
+def test_ics_text_is_escaped_and_folded():
+    row = ("e1", "Salsa, Tango; \"Live\"", "Line one\nline two " + "é" * 60, None,
+           date(2033, 1, 1), time(20), time(22))
+    ics = ics_event(row, "20330101T000000Z")
+    lines = ics.split(b"\r\n")
+    assert b"SUMMARY:Salsa\\, Tango\\; \"Live\"" in lines
+    assert all(len(line) <= 75 for line in lines)
+    # Unfolding gives back the escaped text, multi-byte characters intact
+    unfolded = ics.replace(b"\r\n ", b"").decode()
+    assert "DESCRIPTION:Line one\\nline two " + "é" * 60 + "\r\n" in unfolded
+    assert "CATEGORIES" not in unfolded